@@ -0,0 +1,87 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+RUNS = {
+    "help": (["--help"], ""),
+    "noop": (["--no-tags"], ""),
+    "short": (["--no-tags"], "Dr. Smith paid $5 at 10:30 for the GPU.\n"),
+    "short-tags": ([], "lol that was great\n"),
+}
+
+
+def child_env(src=SRC):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(src), env.get("PYTHONPATH")]))
+    env.pop("SAYABLE_DAEMON", None)
+    # Measure what an installed package sees: bytecode cached, not compiled
+    # from source on every start.
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return env
+
+
+def wall_clock(args, stdin, repeat, src=SRC):
+    command = [sys.executable, "-m", "sayable", *args]
+    times = []
+    subprocess.run(command, input=stdin, text=True, env=child_env(src), stdout=subprocess.DEVNULL, check=True)
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, input=stdin, text=True, env=child_env(src), stdout=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - start)
+    return min(times), statistics.median(times)
+
+
+def import_times(module, src=SRC):
+    # Returns (cumulative_us, self_us, name) for every import -X importtime
+    # reports while importing the module, slowest first.
+    subprocess.run([sys.executable, "-c", f"import {module}"], env=child_env(src), check=True)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=child_env(src),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), name.strip()))
+    rows.sort(reverse=True)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure sayable cold-start cost.")
+    parser.add_argument("--repeat", type=int, default=10, help="Runs per wall-clock case")
+    parser.add_argument("--module", default="sayable.pipeline", help="Module to profile with -X importtime")
+    parser.add_argument("--src", default=str(SRC), help="Source tree to measure, e.g. an older checkout")
+    parser.add_argument("--top", type=int, default=15, help="Imports to list")
+    args = parser.parse_args()
+
+    start_python = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        start_python.append(time.perf_counter() - start)
+    baseline = min(start_python)
+    print(f"{'python -c pass':24s} min {baseline * 1000:7.1f} ms")
+    for name, (cli_args, stdin) in RUNS.items():
+        best, median = wall_clock(cli_args, stdin, args.repeat, args.src)
+        print(f"{'sayable ' + name:24s} min {best * 1000:7.1f} ms  median {median * 1000:7.1f} ms")
+
+    rows = import_times(args.module, args.src)
+    print(f"\nimport {args.module}: {rows[0][0] / 1000:.1f} ms cumulative")
+    for cumulative_us, self_us, name in rows[: args.top]:
+        print(f"  {cumulative_us / 1000:7.1f} ms  self {self_us / 1000:6.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
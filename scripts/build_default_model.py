@@ -0,0 +1,25 @@
+import argparse
+import pprint
+from pathlib import Path
+
+from sayable.classifier import DEFAULT_TRAINING, train_nb
+
+DEFAULT_OUT = Path(__file__).resolve().parent.parent / "src" / "sayable" / "default_model.py"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate the prebuilt default tagger model.")
+    parser.add_argument("--out", default=str(DEFAULT_OUT), help="Output Python module")
+    args = parser.parse_args()
+
+    model = train_nb(DEFAULT_TRAINING)
+    with open(args.out, "w", encoding="utf-8") as f:
+        f.write("# Generated by scripts/build_default_model.py from classifier.DEFAULT_TRAINING.\n")
+        f.write("# Do not edit by hand.\n\n")
+        f.write("DEFAULT_MODEL = ")
+        f.write(pprint.pformat(model, indent=4, width=100))
+        f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
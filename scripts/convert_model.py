@@ -0,0 +1,24 @@
+import argparse
+import json
+
+from sayable.modelfile import PackedModel, is_binary_model, write_binary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a tag model between the JSON and binary formats.")
+    parser.add_argument("input", help="JSON or binary model; the format is detected")
+    parser.add_argument("output", help="Output model, in the other format")
+    args = parser.parse_args()
+
+    if is_binary_model(args.input):
+        model = PackedModel(args.input).to_dict()
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(model, f, ensure_ascii=True, indent=2)
+    else:
+        with open(args.input, "r", encoding="utf-8") as f:
+            model = json.load(f)
+        write_binary(model, args.output)
+
+
+if __name__ == "__main__":
+    main()
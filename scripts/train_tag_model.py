@@ -1,31 +1,87 @@
 import argparse
 import csv
 import json
+import os
 
-from sayable.classifier import train_nb
+from sayable.classifier import FEATURE_SCORES, NaiveBayesTagger, select_features, train_nb
+from sayable.modelfile import VALUE_TYPES, write_binary
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Train a Naive Bayes tag model.")
-    parser.add_argument("--data", required=True, help="CSV with columns: text,label")
-    parser.add_argument("--out", required=True, help="Output JSON model file")
-    args = parser.parse_args()
-
+def read_examples(path):
     examples = []
-    with open(args.data, "r", encoding="utf-8") as f:
+    with open(path, "r", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
             text = (row.get("text") or "").strip()
             label = (row.get("label") or "").strip()
             if text and label:
                 examples.append((text, label))
+    return examples
+
+
+def report(full, tagger, out, examples):
+    # Size and agreement of the written model against the unpruned,
+    # full-precision one, on the evaluation examples.
+    texts = [text for text, _ in examples]
+    expected = [label for _, label in examples]
+    full_labels = [label for label, _ in NaiveBayesTagger(full).predict_batch(texts)]
+    labels = [label for label, _ in tagger.predict_batch(texts)]
+    full_size = len(json.dumps(full, ensure_ascii=True, indent=2))
+    size = os.path.getsize(out)
+    vocab = len(tagger.model["vocab"]) if tagger.model is not None else len(tagger.tables().vocab)
+
+    def share(hits):
+        return 100.0 * hits / max(len(examples), 1)
 
+    print(f"full model:    {len(full['vocab'])} tokens, {full_size} bytes as JSON")
+    print(f"written model: {vocab} tokens, {size} bytes ({100.0 * size / full_size:.1f}%)")
+    print(f"agreement with full model: {share(sum(a == b for a, b in zip(labels, full_labels))):.2f}%")
+    print(f"accuracy: full {share(sum(a == b for a, b in zip(full_labels, expected))):.2f}%, "
+          f"written {share(sum(a == b for a, b in zip(labels, expected))):.2f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train a Naive Bayes tag model.")
+    parser.add_argument("--data", required=True, help="CSV with columns: text,label")
+    parser.add_argument("--out", required=True, help="Output model file")
+    parser.add_argument("--binary", action="store_true", help="Write the compact binary format instead of JSON")
+    parser.add_argument("--min-count", type=int, default=1, help="Drop tokens seen fewer times than this")
+    parser.add_argument("--top-k", type=int, help="Keep only the K best-scoring tokens of each label")
+    parser.add_argument("--score", choices=sorted(FEATURE_SCORES), default="chi2", help="Token score for --top-k")
+    parser.add_argument(
+        "--quantize",
+        choices=[name for name in VALUE_TYPES if name != "float32"],
+        help="Store log-probabilities as integers with a per-label scale (binary format only)",
+    )
+    parser.add_argument("--eval", help="CSV to measure agreement on (default: the training data)")
+    args = parser.parse_args()
+    if args.quantize and not args.binary:
+        parser.error("--quantize needs --binary")
+    if args.min_count < 1:
+        parser.error("--min-count must be at least 1")
+    if args.top_k is not None and args.top_k < 1:
+        parser.error("--top-k must be at least 1")
+
+    examples = read_examples(args.data)
     if not examples:
         raise SystemExit("No training examples found.")
 
-    model = train_nb(examples)
-    with open(args.out, "w", encoding="utf-8") as f:
-        json.dump(model, f, ensure_ascii=True, indent=2)
+    keep = None
+    if args.min_count > 1 or args.top_k is not None:
+        keep = select_features(examples, args.min_count, args.top_k, args.score)
+        if not keep:
+            raise SystemExit(f"No token is seen at least {args.min_count} times; lower --min-count.")
+    model = train_nb(examples, keep=keep)
+    if args.binary:
+        write_binary(model, args.out, args.quantize or "float32")
+        tagger = NaiveBayesTagger.from_binary(args.out)
+    else:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(model, f, ensure_ascii=True, indent=2)
+        tagger = NaiveBayesTagger(model)
+
+    if keep is not None or args.quantize or args.eval:
+        report(train_nb(examples), tagger, args.out, read_examples(args.eval) if args.eval else examples)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,108 @@
+import os
+import time
+
+PRUNE_AGE = 30 * 24 * 3600
+
+_directory = None
+
+
+def default_directory():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "sayable")
+
+
+def enable(directory=None):
+    global _directory
+    _directory = directory or os.environ.get("SAYABLE_ARTIFACT_DIR") or default_directory()
+
+
+def disable():
+    global _directory
+    _directory = None
+
+
+def enabled():
+    return _directory is not None
+
+
+def build_id():
+    # Changes whenever the installed sources change, so nothing built by an
+    # older install (artifacts, cached results, a running daemon) is reused.
+    package = os.path.dirname(os.path.abspath(__file__))
+    stamps = []
+    for name in sorted(os.listdir(package)):
+        if name.endswith(".py"):
+            st = os.stat(os.path.join(package, name))
+            stamps.append(f"{name}:{st.st_mtime_ns}:{st.st_size}")
+    return ";".join(stamps)
+
+
+def artifact_key(sources, options):
+    import hashlib
+
+    digest = hashlib.sha256(build_id().encode("utf-8"))
+    digest.update(repr(options).encode("utf-8"))
+    for path in sources:
+        if not path:
+            digest.update(b"\0-")
+            continue
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        digest.update(f"\0{path}:{st.st_mtime_ns}:{st.st_size}".encode("utf-8", "surrogatepass"))
+        with open(path, "rb") as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+def cached(name, build, sources=(), options=()):
+    # Loads a pickled artifact keyed by the sayable sources, the given source
+    # files (path, mtime, size, content hash) and options; builds and stores
+    # it on a miss. Any cache problem falls back to building in memory.
+    if _directory is None:
+        return build()
+    import pickle
+
+    try:
+        path = os.path.join(_directory, f"{name}-{artifact_key(sources, options)}.pickle")
+    except OSError:
+        return build()
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        pass
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError):
+        pass
+    value = build()
+    save(path, value)
+    return value
+
+
+def save(path, value):
+    import pickle
+    import tempfile
+
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        prune(directory)
+    except OSError:
+        pass
+
+
+def prune(directory):
+    cutoff = time.time() - PRUNE_AGE
+    for entry in os.scandir(directory):
+        if entry.name.endswith(".pickle") and entry.stat().st_atime < cutoff:
+            try:
+                os.unlink(entry.path)
+            except OSError:
+                pass
@@ -0,0 +1,91 @@
+import json
+import multiprocessing
+import time
+
+from .config import check_overrides
+from .pipeline import init_worker, worker_process
+
+
+def process_record(item):
+    lineno, line = item
+    try:
+        record = json.loads(line)
+    except ValueError as exc:
+        return json.dumps({"line": lineno, "error": f"invalid JSON: {exc}"}), 0, True
+    if not isinstance(record, dict) or not isinstance(record.get("text"), str):
+        return json.dumps({"line": lineno, "error": "record needs a string 'text' field"}), 0, True
+    overrides = record.get("config")
+    if overrides is not None and not isinstance(overrides, dict):
+        return record_error(lineno, record, "'config' must be an object of config overrides")
+    try:
+        check_overrides(overrides or {})
+        text = worker_process(record["text"], overrides)
+    except Exception as exc:
+        # One bad record must not take the pool, and the batch, down with it.
+        return record_error(lineno, record, str(exc) or type(exc).__name__)
+    out = {}
+    if "id" in record:
+        out["id"] = record["id"]
+    out["text"] = text
+    return json.dumps(out, ensure_ascii=False), len(record["text"]), False
+
+
+def record_error(lineno, record, message):
+    out = {"line": lineno}
+    if "id" in record:
+        out["id"] = record["id"]
+    out["error"] = message
+    return json.dumps(out, ensure_ascii=False), 0, True
+
+
+def iter_records(stream):
+    for lineno, line in enumerate(stream, 1):
+        if line.strip():
+            yield lineno, line
+
+
+def run_batch(
+    source,
+    sink,
+    config_path=None,
+    overrides=None,
+    model_path=None,
+    workers=None,
+    chunk_size=64,
+    cache_path=None,
+    cache_size=None,
+):
+    stats = {"records": 0, "errors": 0, "chars": 0}
+    start = time.perf_counter()
+    initargs = (config_path, overrides, model_path, cache_path, cache_size)
+    records = iter_records(source)
+
+    if workers == 1:
+        init_worker(*initargs)
+        results = map(process_record, records)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(workers, initializer=init_worker, initargs=initargs)
+        results = pool.imap(process_record, records, chunksize=chunk_size)
+
+    try:
+        for line, chars, failed in results:
+            sink.write(line + "\n")
+            stats["records"] += 1
+            stats["chars"] += chars
+            stats["errors"] += failed
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+
+def format_stats(stats):
+    seconds = max(stats["seconds"], 1e-9)
+    return (
+        f"{stats['records']} records ({stats['errors']} errors), {stats['chars']} chars in {stats['seconds']:.2f}s: "
+        f"{stats['records'] / seconds:.1f} records/s, {stats['chars'] / seconds:.0f} chars/s"
+    )
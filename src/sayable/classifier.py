@@ -1,6 +1,8 @@
 import json
 import math
-import re
+from operator import add
+
+from .lazyre import lazy_compile
 
 DEFAULT_TRAINING = [
     ("haha that was funny", "laugh"),
@@ -30,7 +32,7 @@ DEFAULT_TRAINING = [
     ("let us continue", "none"),
 ]
 
-TOKEN_RE = re.compile(r"[a-z]+(?:'[a-z]+)?|\d+|[:;]-?[)D(]")
+TOKEN_RE = lazy_compile(r"[a-z]+(?:'[a-z]+)?|\d+|[:;]-?[)D(]")
 
 
 def tokenize(text):
@@ -38,7 +40,9 @@ def tokenize(text):
     return TOKEN_RE.findall(text)
 
 
-def train_nb(examples, alpha=1.0):
+def train_nb(examples, alpha=1.0, keep=None):
+    # keep: if given, only these tokens are features; others are ignored as
+    # if they were unknown words.
     labels = sorted({label for _, label in examples})
     label_counts = {label: 0 for label in labels}
     token_counts = {label: {} for label in labels}
@@ -47,35 +51,138 @@ def train_nb(examples, alpha=1.0):
     for text, label in examples:
         label_counts[label] += 1
         for tok in tokenize(text):
+            if keep is not None and tok not in keep:
+                continue
             vocab.add(tok)
             token_counts[label][tok] = token_counts[label].get(tok, 0) + 1
 
+    if not vocab:
+        raise ValueError("no features to train on")
     total_examples = sum(label_counts.values())
     vocab_size = len(vocab)
 
     log_priors = {}
     log_likelihoods = {label: {} for label in labels}
+    log_default = {}
 
+    # Only tokens seen with a label get an entry; every other vocab token
+    # has the label's zero-count probability, log_default.
     for label in labels:
         log_priors[label] = math.log(label_counts[label] / total_examples)
         total_tokens = sum(token_counts[label].values())
-        for tok in vocab:
-            count = token_counts[label].get(tok, 0)
-            prob = (count + alpha) / (total_tokens + alpha * vocab_size)
-            log_likelihoods[label][tok] = math.log(prob)
+        denominator = total_tokens + alpha * vocab_size
+        for tok, count in token_counts[label].items():
+            log_likelihoods[label][tok] = math.log((count + alpha) / denominator)
+        log_default[label] = math.log(alpha / denominator)
 
     return {
         "labels": labels,
         "log_priors": log_priors,
         "log_likelihoods": log_likelihoods,
+        "log_default": log_default,
         "vocab": sorted(vocab),
         "alpha": alpha,
     }
 
 
+def document_counts(examples):
+    # Examples per label, and per label the number of examples each token
+    # occurs in, plus total token occurrences.
+    label_docs = {}
+    token_docs = {}
+    token_totals = {}
+    for text, label in examples:
+        label_docs[label] = label_docs.get(label, 0) + 1
+        docs = token_docs.setdefault(label, {})
+        tokens = tokenize(text)
+        for tok in tokens:
+            token_totals[tok] = token_totals.get(tok, 0) + 1
+        for tok in set(tokens):
+            docs[tok] = docs.get(tok, 0) + 1
+    return label_docs, token_docs, token_totals
+
+
+def chi_square(both, token_only, label_only, neither):
+    n = both + token_only + label_only + neither
+    denominator = (both + label_only) * (token_only + neither) * (both + token_only) * (label_only + neither)
+    if not denominator:
+        return 0.0
+    return n * (both * neither - token_only * label_only) ** 2 / denominator
+
+
+def entropy(*counts):
+    n = sum(counts)
+    return -sum(c / n * math.log2(c / n) for c in counts if c)
+
+
+def information_gain(both, token_only, label_only, neither):
+    # How much knowing whether the token occurs says about "label or not".
+    n = both + token_only + label_only + neither
+    with_token = both + token_only
+    without_token = label_only + neither
+    conditional = 0.0
+    if with_token:
+        conditional += with_token / n * entropy(both, token_only)
+    if without_token:
+        conditional += without_token / n * entropy(label_only, neither)
+    return entropy(both + label_only, token_only + neither) - conditional
+
+
+FEATURE_SCORES = {"chi2": chi_square, "ig": information_gain}
+
+
+def select_features(examples, min_count=1, top_k=None, score="chi2"):
+    # Tokens worth keeping: seen at least min_count times, and with top_k,
+    # among the top_k tokens of some label by one-vs-rest chi-square or
+    # information gain over example counts.
+    label_docs, token_docs, token_totals = document_counts(examples)
+    keep = {tok for tok, count in token_totals.items() if count >= min_count}
+    if top_k is None:
+        return keep
+    scorer = FEATURE_SCORES[score]
+    total = sum(label_docs.values())
+    token_all = {}
+    for docs in token_docs.values():
+        for tok, count in docs.items():
+            token_all[tok] = token_all.get(tok, 0) + count
+    selected = set()
+    for label, docs in token_docs.items():
+        in_label = label_docs[label]
+        scored = []
+        for tok in keep:
+            both = docs.get(tok, 0)
+            token_only = token_all[tok] - both
+            label_only = in_label - both
+            neither = total - both - token_only - label_only
+            # Both scores are symmetric; a label keeps the tokens that
+            # point towards it, not away from it.
+            if both * neither > token_only * label_only:
+                scored.append((scorer(both, token_only, label_only, neither), tok))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        selected.update(tok for _, tok in scored[:top_k])
+    return selected
+
+
+def default_model():
+    # Precomputed train_nb(DEFAULT_TRAINING), regenerated by
+    # scripts/build_default_model.py. Each caller gets its own copy (a
+    # fraction of a millisecond), so changes to one tagger's model stay
+    # there.
+    from copy import deepcopy
+
+    from .default_model import DEFAULT_MODEL
+
+    return deepcopy(DEFAULT_MODEL)
+
+
 class NaiveBayesTagger:
-    def __init__(self, model=None):
-        self.model = model or train_nb(DEFAULT_TRAINING)
+    # model is a train_nb() dict. A tagger loaded from a binary model file
+    # has model None and scores straight from the mapped file.
+    def __init__(self, model=None, tables=None):
+        if tables is None:
+            model = model or default_model()
+        self.model = model
+        self._tables = tables
 
     @classmethod
     def from_json(cls, path):
@@ -83,37 +190,125 @@ class NaiveBayesTagger:
             model = json.load(f)
         return cls(model=model)
 
+    @classmethod
+    def from_binary(cls, path):
+        from .modelfile import PackedModel
+
+        return cls(tables=PackedModel(path))
+
+    def identity(self):
+        # What result caches key on: the model dict, or the file's digest.
+        return self.model if self.model is not None else self._tables.digest()
+
     def predict(self, text):
-        tokens = tokenize(text)
-        labels = self.model["labels"]
-        log_priors = self.model["log_priors"]
-        log_likelihoods = self.model["log_likelihoods"]
-
-        best_label = "none"
-        best_score = float("-inf")
-
-        for label in labels:
-            score = log_priors[label]
-            ll = log_likelihoods[label]
-            for tok in tokens:
-                if tok in ll:
-                    score += ll[tok]
-            if score > best_score:
-                best_score = score
-                best_label = label
-
-        # Convert to a pseudo-confidence with softmax over labels.
-        scores = []
-        for label in labels:
-            s = log_priors[label]
-            ll = log_likelihoods[label]
-            for tok in tokens:
-                if tok in ll:
-                    s += ll[tok]
-            scores.append(s)
-        max_s = max(scores)
-        exps = [math.exp(s - max_s) for s in scores]
-        total = sum(exps) or 1.0
-        probs = [e / total for e in exps]
-        conf = probs[labels.index(best_label)]
-        return best_label, conf
+        return self.predict_batch([text])[0]
+
+    def predict_batch(self, sentences):
+        # (label, confidence) per sentence. The confidence is the softmax of
+        # the label scores at the winning label.
+        tables = self.tables()
+        if len(sentences) >= NUMPY_MIN_BATCH and load_numpy() is not None:
+            return predict_numpy(tables, sentences)
+        return predict_python(tables, sentences)
+
+    def tables(self):
+        if self._tables is None:
+            self._tables = ScoreTables(self.model)
+        return self._tables
+
+
+NUMPY_MIN_BATCH = 64
+_numpy = False
+
+
+def load_numpy():
+    # numpy is optional and takes a while to import, so it is only loaded
+    # once a batch is big enough to pay for it.
+    global _numpy
+    if _numpy is False:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy = numpy
+    return _numpy
+
+
+class ScoreTables:
+    # The model as label-ordered vectors: log priors, and per vocab token a
+    # column of log likelihoods, filled in from log_default where a label
+    # never saw the token. Columns are built the first time a token comes
+    # up. Models from before log_default list every token under every
+    # label; there a missing entry adds 0.0, as skipping it did.
+    # modelfile.PackedModel offers the same interface over a
+    # memory-mapped binary model.
+    def __init__(self, model):
+        self.labels = list(model["labels"])
+        self.priors = tuple(model["log_priors"][label] for label in self.labels)
+        self.likelihoods = [model["log_likelihoods"][label] for label in self.labels]
+        defaults = model.get("log_default")
+        if defaults is None:
+            self.defaults = (0.0,) * len(self.labels)
+            self.vocab = frozenset().union(*self.likelihoods)
+        else:
+            self.defaults = tuple(defaults[label] for label in self.labels)
+            self.vocab = frozenset(model["vocab"])
+        self.columns = {}
+        self.index = self.matrix = None
+
+    def column(self, tok):
+        column = self.columns.get(tok)
+        if column is None and tok in self.vocab:
+            column = tuple(ll.get(tok, default) for ll, default in zip(self.likelihoods, self.defaults))
+            self.columns[tok] = column
+        return column
+
+    def numpy_tables(self, np):
+        # Token -> row of a vocab x labels matrix, built on first use.
+        if self.matrix is None:
+            self.index = {tok: i for i, tok in enumerate(sorted(self.vocab))}
+            matrix = np.tile(np.array(self.defaults, dtype=np.float64), (len(self.index), 1))
+            for j, ll in enumerate(self.likelihoods):
+                rows = [self.index[tok] for tok in ll]
+                matrix[rows, j] = list(ll.values())
+            self.matrix = matrix
+        return self.index, self.matrix
+
+
+def predict_python(tables, sentences):
+    labels, priors, column_of = tables.labels, tables.priors, tables.column
+    results = []
+    for text in sentences:
+        scores = priors
+        for tok in tokenize(text):
+            column = column_of(tok)
+            if column is not None:
+                scores = tuple(map(add, scores, column))
+        best = max(range(len(scores)), key=scores.__getitem__)
+        top = scores[best]
+        total = sum([math.exp(s - top) for s in scores])
+        results.append((labels[best], 1.0 / total))
+    return results
+
+
+def predict_numpy(tables, sentences):
+    # Every known token of the batch gathers its matrix row, np.add.at adds
+    # the rows to their sentence's scores, and the confidence uses a stable
+    # log-sum-exp.
+    np = load_numpy()
+    index, matrix = tables.numpy_tables(np)
+    rows = []
+    owners = []
+    for n, text in enumerate(sentences):
+        for tok in tokenize(text):
+            i = index.get(tok)
+            if i is not None:
+                rows.append(i)
+                owners.append(n)
+    scores = np.tile(np.array(tables.priors, dtype=np.float64), (len(sentences), 1))
+    np.add.at(scores, np.array(owners, dtype=np.intp), matrix[np.array(rows, dtype=np.intp)])
+    best = scores.argmax(axis=1)
+    top = scores[np.arange(len(sentences)), best]
+    conf = 1.0 / np.exp(scores - top[:, None]).sum(axis=1)
+    labels = tables.labels
+    return [(labels[i], float(c)) for i, c in zip(best.tolist(), conf.tolist())]
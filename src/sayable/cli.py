@@ -1,11 +1,7 @@
 import argparse
+import os
 import sys
 
-from .classifier import NaiveBayesTagger
-from .config import load_config
-from .normalizer import normalize_text
-from .tagger import insert_tags
-
 
 def read_input(path):
     if not path or path == "-":
@@ -14,6 +10,61 @@ def read_input(path):
         return f.read()
 
 
+def open_stream_input(path):
+    if not path or path == "-":
+        return sys.stdin
+    return open(path, "rb")
+
+
+def open_stream_output(path):
+    if not path or path == "-":
+        return sys.stdout
+    return open(path, "w", encoding="utf-8")
+
+
+def cache_size_bytes(args):
+    return args.cache_size * 1024 * 1024
+
+
+def run_stream(args, process):
+    from .stream import read_chunks, stream_process
+
+    source = open_stream_input(args.input)
+    sink = open_stream_output(args.output)
+    try:
+        for out in stream_process(read_chunks(source), process):
+            sink.write(out + "\n")
+            sink.flush()
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+
+def run_large(args, process):
+    # Same output as processing the whole input at once, but the input is
+    # memory-mapped and processed in sentence-aligned chunks that are written
+    # as they finish, so memory follows --chunk-kib rather than file size.
+    from .stream import read_chunks, read_mapped, stream_process
+
+    chunk = args.chunk_kib * 1024
+    if not args.input or args.input == "-":
+        chunks = read_chunks(sys.stdin, size=chunk)
+    else:
+        chunks = read_mapped(args.input, size=chunk)
+    sink = open_stream_output(args.output)
+    try:
+        separator = ""
+        for out in stream_process(chunks, process, max_chars=4 * chunk, min_chars=chunk):
+            sink.write(separator + out)
+            separator = " "
+        sink.write("\n")
+    finally:
+        if sink is not sys.stdout:
+            sink.close()
+
+
 def write_output(path, text):
     if not path or path == "-":
         sys.stdout.write(text)
@@ -26,45 +77,316 @@ def write_output(path, text):
             f.write("\n")
 
 
-def build_parser():
-    parser = argparse.ArgumentParser(
-        description="Clean text and optionally inject Chatterbox Turbo tags.",
-    )
-    parser.add_argument("-i", "--input", default="-", help="Input file or '-' for stdin.")
-    parser.add_argument("-o", "--output", default="-", help="Output file or '-' for stdout.")
+def enable_artifacts():
+    # Compiled configs, models and word tables are kept under
+    # ~/.cache/sayable (or $SAYABLE_ARTIFACT_DIR); SAYABLE_ARTIFACTS=0 opts out.
+    if os.environ.get("SAYABLE_ARTIFACTS", "") != "0":
+        from . import artifacts
+
+        artifacts.enable()
+
+
+def add_config_arguments(parser):
     parser.add_argument("--config", help="Path to JSON config.")
-    parser.add_argument("--model", help="Path to JSON tagger model.")
+    parser.add_argument("--model", help="Path to a tagger model, JSON or binary.")
     parser.add_argument("--no-tags", action="store_true", help="Disable tag injection.")
     parser.add_argument("--time-style", choices=["12h", "24h"], help="Override time style.")
     parser.add_argument("--time-zero", choices=["oclock", "hundred"], help="Override time zero policy.")
     parser.add_argument("--no-am-pm", action="store_true", help="Do not include am/pm in 12h style.")
-    return parser
-
-
-def main():
-    parser = build_parser()
-    args = parser.parse_args()
+    parser.add_argument("--cache", help="Reuse results stored in this SQLite file (created if missing).")
+    parser.add_argument("--cache-size", type=int, default=256, help="Result cache size limit in MiB.")
 
-    cfg = load_config(args.config)
 
+def overrides_from_args(args):
+    overrides = {}
     if args.no_tags:
-        cfg["tagger_enabled"] = False
+        overrides["tagger_enabled"] = False
     if args.time_style:
-        cfg["time_style"] = args.time_style
+        overrides["time_style"] = args.time_style
     if args.time_zero:
-        cfg["time_zero"] = args.time_zero
+        overrides["time_zero"] = args.time_zero
     if args.no_am_pm:
-        cfg["time_include_am_pm"] = False
+        overrides["time_include_am_pm"] = False
+    return overrides
 
-    if args.model:
-        classifier = NaiveBayesTagger.from_json(args.model)
-    else:
-        classifier = NaiveBayesTagger()
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Clean text and optionally inject Chatterbox Turbo tags.",
+        epilog=(
+            "Commands: 'sayable batch --help' processes JSON Lines records on a worker pool; "
+            "'sayable serve --help' runs an HTTP service; "
+            "'sayable daemon --help' runs the background process used by --daemon."
+        ),
+    )
+    parser.add_argument("-i", "--input", default="-", help="Input file or '-' for stdin.")
+    parser.add_argument("-o", "--output", default="-", help="Output file or '-' for stdout.")
+    add_config_arguments(parser)
+    parser.add_argument("--input-dir", help="Convert every matching file under this directory.")
+    parser.add_argument("--output-dir", help="Where --input-dir results go, mirroring the input tree.")
+    parser.add_argument(
+        "--include",
+        action="append",
+        help="Glob for --input-dir files, matched against the relative path (repeatable; default: '*').",
+    )
+    parser.add_argument(
+        "--exclude", action="append", default=[], help="Glob of --input-dir files to skip (repeatable)."
+    )
+    parser.add_argument("--suffix", help="Replace each output file's extension with this, e.g. '.say'.")
+    parser.add_argument("--force", action="store_true", help="Rewrite outputs that are newer than their inputs.")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Worker processes for --input-dir (default: CPU count)."
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read input incrementally and write one line per completed sentence as soon as it is ready.",
+    )
+    parser.add_argument(
+        "--large",
+        action="store_true",
+        help="Memory-map the input and process it in chunks, writing as it goes; for inputs too big to hold in memory.",
+    )
+    parser.add_argument("--chunk-kib", type=int, default=1024, help="Chunk size for --large, in KiB.")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Split one large input at paragraph boundaries and process the pieces on this many processes.",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        default=use_daemon_env(),
+        help="Process through a per-user background daemon, starting it if needed (also SAYABLE_DAEMON=1).",
+    )
+    return parser
+
+
+def use_daemon_env():
+    return os.environ.get("SAYABLE_DAEMON", "") not in ("", "0")
+
+
+def build_batch_parser():
+    parser = argparse.ArgumentParser(
+        prog="sayable batch",
+        description="Process JSON Lines records ({\"text\": ..., \"id\": ...}) on a worker pool, keeping input order.",
+    )
+    parser.add_argument("-i", "--input", default="-", help="Input JSONL file or '-' for stdin.")
+    parser.add_argument("-o", "--output", default="-", help="Output JSONL file or '-' for stdout.")
+    add_config_arguments(parser)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument("--chunk-size", type=int, default=64, help="Records handed to a worker at a time.")
+    return parser
+
+
+def batch_main(argv):
+    from .batch import format_stats, run_batch
+
+    args = build_batch_parser().parse_args(argv)
+    enable_artifacts()
+    source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        stats = run_batch(
+            source,
+            sink,
+            config_path=args.config,
+            overrides=overrides_from_args(args),
+            model_path=args.model,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            cache_path=args.cache,
+            cache_size=cache_size_bytes(args),
+        )
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    print(f"sayable batch: {format_stats(stats)}", file=sys.stderr)
+
+
+def build_serve_parser():
+    parser = argparse.ArgumentParser(
+        prog="sayable serve",
+        description="Serve POST /normalize, /tag and /process (JSON {\"text\": ...}) over HTTP.",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind.")
+    parser.add_argument("--port", type=int, default=8080, help="Port to bind.")
+    add_config_arguments(parser)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    return parser
+
+
+def serve_main(argv):
+    import asyncio
+
+    from .server import serve_forever
+
+    args = build_serve_parser().parse_args(argv)
+    enable_artifacts()
+    try:
+        asyncio.run(
+            serve_forever(
+                args.host,
+                args.port,
+                config_path=args.config,
+                overrides=overrides_from_args(args),
+                model_path=args.model,
+                workers=args.workers,
+                cache_path=args.cache,
+                cache_size=cache_size_bytes(args),
+            )
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+def build_daemon_parser():
+    from .daemon import IDLE_TIMEOUT
+
+    parser = argparse.ArgumentParser(
+        prog="sayable daemon",
+        description="Answer --daemon clients over a Unix socket; exits after being idle.",
+    )
+    parser.add_argument("--socket", help="Socket path (default: per-user path in $XDG_RUNTIME_DIR or the temp dir).")
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=IDLE_TIMEOUT,
+        help="Seconds to wait for a request before exiting.",
+    )
+    return parser
+
+
+def daemon_main(argv):
+    from .daemon import DaemonUnavailable, run_daemon
+
+    args = build_daemon_parser().parse_args(argv)
+    enable_artifacts()
+    try:
+        run_daemon(args.socket, args.idle_timeout)
+    except DaemonUnavailable as exc:
+        sys.exit(f"sayable daemon: {exc}")
+    except KeyboardInterrupt:
+        pass
+
+
+def run_via_daemon(args, text):
+    from .daemon import DaemonUnavailable, request_text
+
+    try:
+        return request_text(
+            text,
+            args.config,
+            args.model,
+            overrides_from_args(args),
+            cache_path=args.cache,
+            cache_size=cache_size_bytes(args),
+        )
+    except DaemonUnavailable:
+        return None
+
+
+def tree_main(args):
+    from .tree import format_tree_stats, run_tree
+
+    stats = run_tree(
+        args.input_dir,
+        args.output_dir,
+        include=args.include or ["*"],
+        exclude=args.exclude,
+        suffix=args.suffix,
+        force=args.force,
+        config_path=args.config,
+        overrides=overrides_from_args(args),
+        model_path=args.model,
+        workers=args.workers,
+        cache_path=args.cache,
+        cache_size=cache_size_bytes(args),
+    )
+    print(f"sayable: {format_tree_stats(stats)}", file=sys.stderr)
+    if stats["errors"]:
+        sys.exit(1)
+
+
+def jobs_main(args):
+    from .parallel import process_document
 
     text = read_input(args.input)
-    text = normalize_text(text, cfg)
-    text = insert_tags(text, classifier, cfg)
-    write_output(args.output, text)
+    result = process_document(
+        text,
+        jobs=args.jobs,
+        config_path=args.config,
+        overrides=overrides_from_args(args),
+        model_path=args.model,
+        cache_path=args.cache,
+        cache_size=cache_size_bytes(args),
+    )
+    write_output(args.output, result)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["batch"]:
+        batch_main(argv[1:])
+        return
+    if argv[:1] == ["serve"]:
+        serve_main(argv[1:])
+        return
+    if argv[:1] == ["daemon"]:
+        daemon_main(argv[1:])
+        return
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.input_dir or args.output_dir:
+        if not (args.input_dir and args.output_dir):
+            parser.error("--input-dir and --output-dir go together")
+        if args.stream or args.large or args.input != "-" or args.output != "-":
+            parser.error("--input-dir cannot be combined with --stream, --large, --input or --output")
+        enable_artifacts()
+        tree_main(args)
+        return
+
+    if args.stream and args.large:
+        parser.error("--stream and --large cannot be combined")
+    if args.jobs is not None and (args.stream or args.large):
+        parser.error("--jobs cannot be combined with --stream or --large")
+    if args.jobs is not None:
+        enable_artifacts()
+        jobs_main(args)
+        return
+
+    text = None
+    if args.daemon and not args.stream and not args.large:
+        text = read_input(args.input)
+        result = run_via_daemon(args, text)
+        if result is not None:
+            write_output(args.output, result)
+            return
+
+    enable_artifacts()
+    from .pipeline import load_pipeline, make_processor, open_store
+
+    cfg, classifier = load_pipeline(args.config, overrides_from_args(args), args.model)
+    store = open_store(args.cache, cache_size_bytes(args))
+    process = make_processor(cfg, classifier, store)
+    try:
+        if args.stream:
+            run_stream(args, process)
+            return
+        if args.large:
+            run_large(args, process)
+            return
+        if text is None:
+            text = read_input(args.input)
+        write_output(args.output, process(text))
+    finally:
+        if store is not None:
+            store.close()
 
 
 if __name__ == "__main__":
@@ -1,4 +1,3 @@
-import json
 from copy import deepcopy
 
 SUPPORTED_TAGS = [
@@ -33,6 +32,7 @@ DEFAULT_CONFIG = {
     "minute_leading_zero": "oh",
     "paren_policy": "expand",
     "strip_emoji": True,
+    "fold_typography": False,
     "tagger_enabled": True,
     "tag_min_confidence": 0.3,
     "tag_position": "prefix",
@@ -244,8 +244,31 @@ DEFAULT_CONFIG = {
 def load_config(path):
     if not path:
         return deepcopy(DEFAULT_CONFIG)
+    import json
+
     with open(path, "r", encoding="utf-8") as f:
         data = json.load(f)
     cfg = deepcopy(DEFAULT_CONFIG)
     cfg.update(data)
     return cfg
+
+
+def check_overrides(overrides):
+    # Per-request overrides arrive as JSON, so a wrong type would otherwise
+    # only fail deep inside a stage. Keys the defaults do not have pass.
+    for key, value in overrides.items():
+        default = DEFAULT_CONFIG.get(key)
+        if isinstance(default, dict):
+            ok = isinstance(value, dict) and all(isinstance(v, str) for v in value.values())
+            expected = "an object of strings"
+        elif isinstance(default, list):
+            ok = isinstance(value, list) and all(isinstance(v, str) for v in value)
+            expected = "a list of strings"
+        elif isinstance(default, float):
+            ok = isinstance(value, (int, float)) and not isinstance(value, bool)
+            expected = "a number"
+        else:
+            ok = not isinstance(value, (dict, list))
+            expected = "a single value"
+        if not ok:
+            raise ValueError(f"config override {key!r} must be {expected}")
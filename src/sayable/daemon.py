@@ -0,0 +1,262 @@
+import json
+import os
+import socket
+import stat
+import struct
+import sys
+import time
+
+from .artifacts import build_id
+
+
+HEADER = struct.Struct("!I")
+MAX_MESSAGE = 64 * 1024 * 1024
+CONNECT_TIMEOUT = 5.0
+REPLY_TIMEOUT = 120.0
+IDLE_TIMEOUT = 600.0
+
+
+class DaemonUnavailable(Exception):
+    pass
+
+
+def socket_path():
+    path = os.environ.get("SAYABLE_SOCKET")
+    if path:
+        return path
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime and os.path.isdir(runtime):
+        return os.path.join(runtime, socket_name())
+    import tempfile
+
+    # The temp dir is shared, so the socket goes in a directory only this
+    # user can enter; otherwise anyone could bind the path first.
+    directory = os.path.join(tempfile.gettempdir(), f"sayable-{os.getuid()}")
+    private_dir(directory)
+    return os.path.join(directory, socket_name())
+
+
+def socket_name():
+    # One socket per install (interpreter and package directory): installs
+    # sharing one would each find the other's daemon stale and replace it.
+    # An install updated in place is still caught by the build check.
+    import hashlib
+
+    install = os.fsencode(f"{sys.executable}\0{os.path.dirname(os.path.abspath(__file__))}")
+    return f"sayable-{hashlib.sha256(install).hexdigest()[:12]}.sock"
+
+
+def private_dir(directory):
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise DaemonUnavailable(f"{directory} is not a private directory")
+
+
+def send_message(sock, payload):
+    data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    sock.sendall(HEADER.pack(len(data)) + data)
+
+
+def recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def recv_message(sock):
+    (size,) = HEADER.unpack(recv_exact(sock, HEADER.size))
+    if size > MAX_MESSAGE:
+        raise ConnectionError("message too large")
+    return json.loads(recv_exact(sock, size))
+
+
+class PipelineCache:
+    def __init__(self):
+        self.pool = None
+        self.stores = {}
+
+    def get(self, config_path, model_path, overrides, cache_path=None, cache_size=None):
+        from .pipeline import PipelinePool, open_store
+
+        if self.pool is None:
+            self.pool = PipelinePool(max_entries=8)
+        if cache_path and cache_path not in self.stores:
+            self.stores[cache_path] = open_store(cache_path, cache_size)
+        pipeline = self.pool.get(overrides, config_path, model_path)
+        store = self.stores.get(cache_path)
+        return lambda text: pipeline.process(text, store)
+
+    def close(self):
+        for store in self.stores.values():
+            store.close()
+        self.stores.clear()
+
+
+def handle_request(request, cache, ident):
+    if request.get("build") != ident:
+        return {"error": "stale"}
+    try:
+        process = cache.get(
+            request.get("config"),
+            request.get("model"),
+            request.get("overrides") or {},
+            request.get("cache"),
+            request.get("cache_size"),
+        )
+        return {"text": process(request["text"])}
+    except Exception as exc:
+        # Bad paths or overrides: the client falls back to running
+        # in-process, which reports the error properly.
+        return {"error": str(exc) or type(exc).__name__}
+
+
+def bind(path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.bind(path)
+    except OSError:
+        # Another daemon may own the path; only clear it if nobody answers.
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+        except OSError:
+            os.unlink(path)
+            sock.bind(path)
+        else:
+            probe.close()
+            sock.close()
+            return None
+    os.chmod(path, 0o600)
+    sock.listen(64)
+    return sock
+
+
+def run_daemon(path=None, idle_timeout=IDLE_TIMEOUT):
+    path = path or socket_path()
+    old_umask = os.umask(0o077)
+    try:
+        listener = bind(path)
+    finally:
+        os.umask(old_umask)
+    if listener is None:
+        return
+    cache = PipelineCache()
+    ident = build_id()
+    listener.settimeout(idle_timeout)
+    try:
+        while True:
+            try:
+                conn, _ = listener.accept()
+            except socket.timeout:
+                break
+            with conn:
+                conn.settimeout(30)
+                try:
+                    reply = handle_request(recv_message(conn), cache, ident)
+                    send_message(conn, reply)
+                except Exception:
+                    # A broken or malformed request only costs its connection.
+                    continue
+            if reply.get("error") == "stale":
+                break
+    finally:
+        cache.close()
+        listener.close()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def spawn_daemon(path):
+    import subprocess
+
+    subprocess.Popen(
+        [sys.executable, "-m", "sayable", "daemon", "--socket", path],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+        close_fds=True,
+    )
+
+
+def connect(path):
+    # Only talk to a daemon run by this user: the socket file must be ours,
+    # and so must the peer where the platform reports it.
+    if os.stat(path).st_uid != os.getuid():
+        raise DaemonUnavailable(f"{path} belongs to another user")
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        if hasattr(socket, "SO_PEERCRED"):
+            creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+            if struct.unpack("3i", creds)[1] != os.getuid():
+                raise DaemonUnavailable(f"{path} is served by another user")
+        sock.settimeout(REPLY_TIMEOUT)
+    except Exception:
+        sock.close()
+        raise
+    return sock
+
+
+def ask(path, request):
+    with connect(path) as sock:
+        send_message(sock, request)
+        return recv_message(sock)
+
+
+def request_text(
+    text,
+    config_path=None,
+    model_path=None,
+    overrides=None,
+    path=None,
+    cache_path=None,
+    cache_size=None,
+):
+    path = path or socket_path()
+    request = {
+        "build": build_id(),
+        "text": text,
+        "config": os.path.abspath(config_path) if config_path else None,
+        "model": os.path.abspath(model_path) if model_path else None,
+        "overrides": overrides or {},
+        "cache": os.path.abspath(cache_path) if cache_path else None,
+        "cache_size": cache_size,
+    }
+    try:
+        reply = ask(path, request)
+    except (OSError, ValueError):
+        reply = None
+    if reply is None or reply.get("error") == "stale":
+        if reply is not None:
+            # The stale daemon exits after answering; wait for it to let go.
+            time.sleep(0.05)
+        spawn_daemon(path)
+        reply = wait_for_daemon(path, request)
+    if "text" not in reply:
+        raise DaemonUnavailable(reply.get("error", "no reply"))
+    return reply["text"]
+
+
+def wait_for_daemon(path, request):
+    deadline = time.monotonic() + CONNECT_TIMEOUT
+    delay = 0.01
+    while True:
+        try:
+            return ask(path, request)
+        except (OSError, ValueError) as exc:
+            if time.monotonic() > deadline:
+                raise DaemonUnavailable(str(exc)) from None
+        time.sleep(delay)
+        delay = min(delay * 2, 0.2)
@@ -0,0 +1,116 @@
+# Generated by scripts/build_default_model.py from classifier.DEFAULT_TRAINING.
+# Do not edit by hand.
+
+DEFAULT_MODEL = {   'alpha': 1.0,
+    'labels': [   'chuckle',
+                  'clear_throat',
+                  'cough',
+                  'gasp',
+                  'groan',
+                  'laugh',
+                  'none',
+                  'shush',
+                  'sigh',
+                  'sniff'],
+    'log_default': {   'chuckle': -3.871201010907891,
+                       'clear_throat': -3.784189633918261,
+                       'cough': -3.7376696182833684,
+                       'gasp': -3.784189633918261,
+                       'groan': -3.784189633918261,
+                       'laugh': -3.891820298110627,
+                       'none': -3.8066624897703196,
+                       'shush': -3.7376696182833684,
+                       'sigh': -3.8066624897703196,
+                       'sniff': -3.7376696182833684},
+    'log_likelihoods': {   'chuckle': {   'chuckle': -3.1780538303479458,
+                                          'heh': -3.1780538303479458,
+                                          'hmm': -3.1780538303479458,
+                                          'made': -3.1780538303479458,
+                                          'me': -3.1780538303479458,
+                                          'okay': -3.1780538303479458,
+                                          'that': -3.1780538303479458,
+                                          'well': -3.1780538303479458},
+                           'clear_throat': {   'ahem': -3.0910424533583156,
+                                               'clearing': -3.0910424533583156,
+                                               'my': -3.0910424533583156,
+                                               'throat': -3.0910424533583156},
+                           'cough': {'cough': -3.044522437723423, 'coughing': -3.044522437723423},
+                           'gasp': {   'gosh': -3.0910424533583156,
+                                       'no': -3.0910424533583156,
+                                       'oh': -3.0910424533583156,
+                                       'wow': -3.0910424533583156},
+                           'groan': {   'annoying': -3.0910424533583156,
+                                        'is': -3.0910424533583156,
+                                        'this': -3.0910424533583156,
+                                        'ugh': -3.0910424533583156},
+                           'laugh': {   'funny': -3.1986731175506815,
+                                        'haha': -3.1986731175506815,
+                                        'hilarious': -3.1986731175506815,
+                                        'is': -3.1986731175506815,
+                                        'lmao': -3.1986731175506815,
+                                        'lol': -3.1986731175506815,
+                                        'that': -3.1986731175506815,
+                                        'this': -3.1986731175506815,
+                                        'was': -3.1986731175506815},
+                           'none': {   'continue': -3.1135153092103742,
+                                       'let': -3.1135153092103742,
+                                       'okay': -3.1135153092103742,
+                                       'thanks': -3.1135153092103742,
+                                       'us': -3.1135153092103742},
+                           'shush': {'shh': -3.044522437723423, 'shush': -3.044522437723423},
+                           'sigh': {   'about': -3.1135153092103742,
+                                       'guess': -3.1135153092103742,
+                                       'i': -3.1135153092103742,
+                                       'sorry': -3.1135153092103742,
+                                       'that': -3.1135153092103742},
+                           'sniff': {'sniff': -3.044522437723423, 'sniffing': -3.044522437723423}},
+    'log_priors': {   'chuckle': -2.120263536200091,
+                      'clear_throat': -2.5257286443082556,
+                      'cough': -2.5257286443082556,
+                      'gasp': -2.120263536200091,
+                      'groan': -2.5257286443082556,
+                      'laugh': -1.8325814637483102,
+                      'none': -2.120263536200091,
+                      'shush': -2.5257286443082556,
+                      'sigh': -2.5257286443082556,
+                      'sniff': -2.5257286443082556},
+    'vocab': [   'about',
+                 'ahem',
+                 'annoying',
+                 'chuckle',
+                 'clearing',
+                 'continue',
+                 'cough',
+                 'coughing',
+                 'funny',
+                 'gosh',
+                 'guess',
+                 'haha',
+                 'heh',
+                 'hilarious',
+                 'hmm',
+                 'i',
+                 'is',
+                 'let',
+                 'lmao',
+                 'lol',
+                 'made',
+                 'me',
+                 'my',
+                 'no',
+                 'oh',
+                 'okay',
+                 'shh',
+                 'shush',
+                 'sniff',
+                 'sniffing',
+                 'sorry',
+                 'thanks',
+                 'that',
+                 'this',
+                 'throat',
+                 'ugh',
+                 'us',
+                 'was',
+                 'well',
+                 'wow']}
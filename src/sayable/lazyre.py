@@ -0,0 +1,36 @@
+import re
+
+
+class LazyPattern:
+    # Stands in for a compiled regex and compiles it on first use, so module
+    # import does not pay for patterns a run never touches. After the first
+    # attribute lookup the pattern's methods live in the instance dict, so
+    # later calls cost the same as on a plain compiled pattern.
+    def __init__(self, pattern, flags=0):
+        self._source = (pattern, flags)
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        compiled = re.compile(*self._source)
+        for attr in ("sub", "subn", "search", "match", "fullmatch", "finditer", "findall", "split"):
+            setattr(self, attr, getattr(compiled, attr))
+        self.pattern = compiled.pattern
+        self.flags = compiled.flags
+        self.groupindex = compiled.groupindex
+        self.groups = compiled.groups
+        return getattr(compiled, name)
+
+
+def lazy_compile(pattern, flags=0):
+    return LazyPattern(pattern, flags)
+
+
+def ascii_variant(pattern):
+    # The same pattern with re.ASCII: \w, \d, \s, \b and IGNORECASE only
+    # know ASCII, which makes scans noticeably faster.
+    if isinstance(pattern, LazyPattern):
+        source, flags = pattern._source
+    else:
+        source, flags = pattern.pattern, pattern.flags & ~re.UNICODE
+    return lazy_compile(source, flags | re.ASCII)
@@ -0,0 +1,78 @@
+import re
+from functools import lru_cache
+
+
+class LexiconMatcher:
+    def __init__(self, mapping, word_boundaries=True):
+        self.replacements = {}
+        self.folded = {}
+        for key, value in mapping.items():
+            if not key:
+                continue
+            self.replacements.setdefault(key.lower(), value)
+            self.folded.setdefault(key.casefold(), value)
+        self.pattern = compile_trie(self.replacements.keys(), word_boundaries)
+
+    def lookup(self, term):
+        value = self.replacements.get(term.lower())
+        if value is None:
+            value = self.folded.get(term.casefold(), term)
+        return value
+
+    def repl(self, match):
+        return self.lookup(match.group(0))
+
+    def sub(self, text):
+        if self.pattern is None:
+            return text
+        return self.pattern.sub(self.repl, text)
+
+
+def build_trie(keys):
+    root = {}
+    for key in keys:
+        node = root
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[""] = True
+    return root
+
+
+def trie_to_regex(node):
+    # Children come before the terminal marker so the engine tries the
+    # longest entry first and backtracks to shorter ones on a boundary miss.
+    branches = []
+    for ch in sorted(k for k in node if k):
+        child = node[ch]
+        literal = re.escape(ch)
+        while len(child) == 1 and "" not in child:
+            (nxt, child), = child.items()
+            literal += re.escape(nxt)
+        rest = trie_to_regex(child)
+        branches.append(literal + rest)
+    if "" in node:
+        if not branches:
+            return ""
+        branches.append("")
+    if len(branches) == 1:
+        return branches[0]
+    return "(?:" + "|".join(branches) + ")"
+
+
+def compile_trie(keys, word_boundaries=True):
+    keys = [k for k in keys if k]
+    if not keys:
+        return None
+    body = trie_to_regex(build_trie(keys))
+    if word_boundaries:
+        body = r"(?<!\w)" + body + r"(?!\w)"
+    return re.compile(body, re.IGNORECASE)
+
+
+@lru_cache(maxsize=64)
+def _compile_lexicon(items, word_boundaries):
+    return LexiconMatcher(dict(items), word_boundaries)
+
+
+def compile_lexicon(mapping, word_boundaries=True):
+    return _compile_lexicon(tuple(mapping.items()), word_boundaries)
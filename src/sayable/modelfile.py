@@ -0,0 +1,195 @@
+import struct
+import sys
+from array import array
+
+# Binary tagger model, little-endian:
+#   header     MAGIC, version, label count, vocab count, alpha
+#   value type uint32 code from VALUE_TYPES (version 2 and later)
+#   labels     string table
+#   priors     float64 per label
+#   scales     float64 scale then offset per label, quantized types only
+#   vocab      string table, tokens sorted
+#   matrix     one row per vocab token with a column per label, 4-byte
+#              aligned; a quantized value q stands for q * scale + offset
+# A string table is count + 1 uint32 end offsets (starting at 0) followed
+# by the UTF-8 bytes. The matrix is dense: a label that never saw a token
+# stores its log_default there (0.0 for models without one, which adds
+# what skipping the token would). Version 1 files are float32 only.
+MAGIC = b"SAYNB\0\0\0"
+VERSION = 2
+HEADER = struct.Struct("<8sIIId")
+# name: (code, array typecode, largest quantized magnitude)
+VALUE_TYPES = {"float32": (0, "f", None), "int16": (1, "h", 32767), "int8": (2, "b", 127)}
+
+
+def is_binary_model(path):
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def pack_strings(strings):
+    blobs = [s.encode("utf-8") for s in strings]
+    offsets = array("I", [0])
+    for blob in blobs:
+        offsets.append(offsets[-1] + len(blob))
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    return offsets.tobytes() + b"".join(blobs)
+
+
+def unpack_strings(buffer, offset, count):
+    ends = struct.unpack_from(f"<{count + 1}I", buffer, offset)
+    start = offset + 4 * (count + 1)
+    blob = bytes(buffer[start:start + ends[-1]])
+    strings = [blob[ends[i]:ends[i + 1]].decode("utf-8") for i in range(count)]
+    return strings, start + ends[-1]
+
+
+def quantize_column(values, limit):
+    # Affine per label: the column's range maps onto [-limit, limit].
+    low, high = min(values), max(values)
+    scale = (high - low) / (2 * limit) or 1.0
+    offset = (high + low) / 2
+    return [max(-limit, min(limit, round((v - offset) / scale))) for v in values], scale, offset
+
+
+def write_binary(model, path, value_type="float32"):
+    labels = list(model["labels"])
+    log_likelihoods = model["log_likelihoods"]
+    defaults = model.get("log_default")
+    if defaults is None:
+        vocab = sorted(set().union(*(log_likelihoods[label] for label in labels)))
+        defaults = dict.fromkeys(labels, 0.0)
+    else:
+        vocab = sorted(model["vocab"])
+    code, typecode, limit = VALUE_TYPES[value_type]
+    columns = [[log_likelihoods[label].get(tok, defaults[label]) for tok in vocab] for label in labels]
+    scales = b""
+    if limit is not None and vocab:
+        quantized = [quantize_column(column, limit) for column in columns]
+        columns = [q for q, _, _ in quantized]
+        scales = struct.pack(f"<{2 * len(labels)}d", *(x for _, scale, offset in quantized for x in (scale, offset)))
+    elif limit is not None:
+        scales = struct.pack(f"<{2 * len(labels)}d", *([1.0, 0.0] * len(labels)))
+    matrix = array(typecode, [column[i] for i in range(len(vocab)) for column in columns])
+    if sys.byteorder != "little":
+        matrix.byteswap()
+    parts = [
+        HEADER.pack(MAGIC, VERSION, len(labels), len(vocab), float(model.get("alpha", 1.0))),
+        struct.pack("<I", code),
+        pack_strings(labels),
+        struct.pack(f"<{len(labels)}d", *(model["log_priors"][label] for label in labels)),
+        scales,
+        pack_strings(vocab),
+    ]
+    size = sum(len(part) for part in parts)
+    parts.append(b"\0" * (-size % 4))
+    parts.append(matrix.tobytes())
+    with open(path, "wb") as f:
+        f.write(b"".join(parts))
+
+
+class QuantizedRows:
+    # Indexed like the numpy matrix, dequantizing only the rows taken.
+    def __init__(self, values, scales, offsets):
+        self.values = values
+        self.scales = scales
+        self.offsets = offsets
+
+    def __getitem__(self, rows):
+        return self.values[rows] * self.scales + self.offsets
+
+
+class PackedModel:
+    # A binary model read through mmap: the float32 matrix stays in the
+    # mapping, so forked workers share its pages. Only the labels, priors
+    # and a token -> row dict are Python objects.
+    def __init__(self, path):
+        import mmap
+
+        with open(path, "rb") as f:
+            self.mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, label_count, vocab_count, self.alpha = HEADER.unpack_from(self.mapped, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a sayable binary model")
+        if version not in (1, 2):
+            raise ValueError(f"{path}: unsupported model version {version}")
+        offset = HEADER.size
+        code = 0
+        if version >= 2:
+            (code,) = struct.unpack_from("<I", self.mapped, offset)
+            offset += 4
+        types = {entry[0]: name for name, entry in VALUE_TYPES.items()}
+        if code not in types:
+            raise ValueError(f"{path}: unknown value type {code}")
+        self.value_type = types[code]
+        _, typecode, limit = VALUE_TYPES[self.value_type]
+        self.labels, offset = unpack_strings(self.mapped, offset, label_count)
+        self.priors = struct.unpack_from(f"<{label_count}d", self.mapped, offset)
+        offset += 8 * label_count
+        self.scales = self.offsets = None
+        if limit is not None:
+            pairs = struct.unpack_from(f"<{2 * label_count}d", self.mapped, offset)
+            self.scales, self.offsets = pairs[0::2], pairs[1::2]
+            offset += 16 * label_count
+        self.vocab, offset = unpack_strings(self.mapped, offset, vocab_count)
+        self.matrix_offset = offset + (-offset % 4)
+        self.index = {tok: i for i, tok in enumerate(self.vocab)}
+        itemsize = array(typecode).itemsize
+        size = itemsize * vocab_count * label_count
+        if self.matrix_offset + size > len(self.mapped):
+            raise ValueError(f"{path}: truncated model file")
+        view = memoryview(self.mapped)[self.matrix_offset:self.matrix_offset + size]
+        if sys.byteorder == "little" or itemsize == 1:
+            self.matrix = view.cast(typecode)
+        else:
+            self.matrix = array(typecode, view.tobytes())
+            self.matrix.byteswap()
+        self._digest = None
+        self._numpy_matrix = None
+
+    def row(self, i):
+        width = len(self.labels)
+        values = self.matrix[i * width:(i + 1) * width]
+        if self.scales is None:
+            return values
+        return tuple([q * scale + offset for q, scale, offset in zip(values, self.scales, self.offsets)])
+
+    def column(self, tok):
+        # The label scores of tok, as classifier.ScoreTables.column.
+        i = self.index.get(tok)
+        return None if i is None else self.row(i)
+
+    def numpy_tables(self, np):
+        if self._numpy_matrix is None:
+            typecode = VALUE_TYPES[self.value_type][1]
+            dtype = np.dtype(typecode).newbyteorder("<")
+            count = len(self.vocab) * len(self.labels)
+            matrix = np.frombuffer(self.mapped, dtype=dtype, count=count, offset=self.matrix_offset)
+            matrix = matrix.reshape(len(self.vocab), len(self.labels))
+            if self.scales is not None:
+                matrix = QuantizedRows(matrix, np.array(self.scales), np.array(self.offsets))
+            self._numpy_matrix = matrix
+        return self.index, self._numpy_matrix
+
+    def digest(self):
+        if self._digest is None:
+            import hashlib
+
+            self._digest = hashlib.sha256(self.mapped).hexdigest()
+        return self._digest
+
+    def to_dict(self):
+        # The JSON model format, with the stored (float32 or dequantized)
+        # values.
+        log_likelihoods = {label: {} for label in self.labels}
+        for i, tok in enumerate(self.vocab):
+            for label, value in zip(self.labels, self.row(i)):
+                log_likelihoods[label][tok] = value
+        return {
+            "labels": list(self.labels),
+            "log_priors": dict(zip(self.labels, self.priors)),
+            "log_likelihoods": log_likelihoods,
+            "vocab": list(self.vocab),
+            "alpha": self.alpha,
+        }
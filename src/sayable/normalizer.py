@@ -1,43 +1,143 @@
 import re
-import unicodedata
-from urllib.parse import parse_qsl, unquote, urlparse
+from copy import deepcopy
+from weakref import WeakKeyDictionary
 
+from . import artifacts
+from .cache import LRUCache
+from .lazyre import ascii_variant, lazy_compile
+from .lexicon import compile_lexicon
+from .spans import UNTRACKED, SourceMap, apply_edits
 
-BULLET_RE = re.compile(r"^\s*(?:[-*•]|\d+[\.)])\s+(.*)$")
-TIME_RE = re.compile(
+
+BULLET_RE = lazy_compile(r"^\s*(?:[-*•]|\d+[\.)])\s+(.*)$")
+TIME_RE = lazy_compile(
     r"\b([01]?\d|2[0-3]):([0-5]\d)(?:\s?(a\.?m\.?|p\.?m\.?))?\b",
     re.IGNORECASE,
 )
-ORDINAL_RE = re.compile(r"\b(\d+)(st|nd|rd|th)\b", re.IGNORECASE)
-DECIMAL_RE = re.compile(r"\b\d+\.\d+\b")
-NUMBER_RE = re.compile(r"\b\d{1,3}(?:,\d{3})+\b|\b\d+\b")
-SFX_RE = re.compile(r"(\*\s*|\(|\[)\s*(sigh|laugh|chuckle|gasp|groan|cough|sniff|shush|clear throat)\s*(\*\s*|\)|\])", re.IGNORECASE)
-URL_RE = re.compile(r"\b(?:https?://|www\.)[^\s<>]+", re.IGNORECASE)
-EMAIL_RE = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
-HANDLE_RE = re.compile(r"(?<!\w)@([A-Za-z0-9_]{1,30})")
-HASHTAG_RE = re.compile(r"(?<!\w)#([A-Za-z0-9_]+)")
-WIN_PATH_RE = re.compile(r"\b[A-Za-z]:\\[^\s)]+")
-UNIX_PATH_RE = re.compile(r"(?<!\w)(?:~?/)(?:[^\s/]+/)*[^\s/]+")
-VERSION_RE = re.compile(r"\bv?(\d+(?:\.\d+)+)\b", re.IGNORECASE)
-IP_RE = re.compile(r"\b(?:\d{1,3}\.){3}\d{1,3}\b")
-MAC_RE = re.compile(r"\b(?:[0-9A-Fa-f]{2}:){5}[0-9A-Fa-f]{2}\b")
-HEX_RE = re.compile(r"\b0x[0-9A-Fa-f]+\b")
-UNIT_RE = re.compile(
-    r"\b(\d+(?:\.\d+)?)\s?(kb|mb|gb|tb|kib|mib|gib|tib|hz|khz|mhz|ghz|kbps|mbps|gbps|ms|s|sec|secs|min|mins|hr|hrs|fps|dpi|ppi|px|%)\b",
-    re.IGNORECASE,
-)
-HYPHEN_UNIT_RE = re.compile(
-    r"\b(\d+(?:\.\d+)?)-(kb|mb|gb|tb|kib|mib|gib|tib|hz|khz|mhz|ghz|kbps|mbps|gbps|ms|s|sec|secs|min|mins|hr|hrs|fps|dpi|ppi|px|%)\b",
-    re.IGNORECASE,
-)
-QUANT_MIN_RE = re.compile(
-    r"\b(a|an|one|two|three|four|five|six|seven|eight|nine|ten|couple|few|several)\s+(min|mins)\b",
-    re.IGNORECASE,
+ORDINAL_RE = lazy_compile(r"\b(\d+)(st|nd|rd|th)\b", re.IGNORECASE)
+GROUPED_INT = r"(?:\d{1,3}(?:,\d{3})+|\d+)"
+DECIMAL_RE = lazy_compile(rf"\b{GROUPED_INT}\.\d+\b")
+NUMBER_RE = lazy_compile(r"\b\d{1,3}(?:,\d{3})+\b|\b\d+\b")
+SFX_RE = lazy_compile(r"(\*\s*|\(|\[)\s*(sigh|laugh|chuckle|gasp|groan|cough|sniff|shush|clear throat)\s*(\*\s*|\)|\])", re.IGNORECASE)
+URL_RE = lazy_compile(r"\b(?:https?://|www\.)[^\s<>]+", re.IGNORECASE)
+EMAIL_RE = lazy_compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
+HANDLE_RE = lazy_compile(r"(?<!\w)@([A-Za-z0-9_]{1,30})")
+HASHTAG_RE = lazy_compile(r"(?<!\w)#([A-Za-z0-9_]+)")
+WIN_PATH_RE = lazy_compile(r"\b[A-Za-z]:\\[^\s)]+")
+UNIX_PATH_RE = lazy_compile(r"(?<!\w)(?:~?/)(?:[^\s/]+/)*[^\s/]+")
+VERSION_RE = lazy_compile(r"\bv?(\d+(?:\.\d+)+)\b", re.IGNORECASE)
+IP_RE = lazy_compile(r"\b(?:\d{1,3}\.){3}\d{1,3}\b")
+MAC_RE = lazy_compile(r"\b(?:[0-9A-Fa-f]{2}:){5}[0-9A-Fa-f]{2}\b")
+HEX_RE = lazy_compile(r"\b0x[0-9A-Fa-f]+\b")
+UNIT_NAMES = r"kb|mb|gb|tb|kib|mib|gib|tib|hz|khz|mhz|ghz|kbps|mbps|gbps|ms|s|sec|secs|min|mins|hr|hrs|fps|dpi|ppi|px|%"
+UNIT_RE = lazy_compile(rf"\b({GROUPED_INT}(?:\.\d+)?)\s?({UNIT_NAMES})\b", re.IGNORECASE)
+HYPHEN_UNIT_RE = lazy_compile(rf"\b({GROUPED_INT}(?:\.\d+)?)-({UNIT_NAMES})\b", re.IGNORECASE)
+MINUTE_QUANTIFIERS = r"a|an|one|two|three|four|five|six|seven|eight|nine|ten|couple|few|several"
+QUANT_MIN_RE = lazy_compile(rf"\b({MINUTE_QUANTIFIERS})\s+(min|mins)\b", re.IGNORECASE)
+NUMERIC_RE = lazy_compile(
+    r"\b(?:"
+    r"(?P<ip>(?:\d{1,3}\.){3}\d{1,3}\b)"
+    r"|(?P<version>[vV]?(?P<version_num>\d+(?:\.\d+)+)\b)"
+    r"|(?P<mac>(?:[0-9A-Fa-f]{2}:){5}[0-9A-Fa-f]{2}\b)"
+    r"|(?=\d)(?:"
+    r"(?P<hex>0x[0-9A-Fa-f]+\b)"
+    rf"|(?P<hyphen_unit>(?P<hyphen_num>{GROUPED_INT}(?:\.\d+)?)-(?P<hyphen_name>(?i:{UNIT_NAMES}))\b)"
+    rf"|(?P<unit>(?P<unit_num>{GROUPED_INT}(?:\.\d+)?)\s?(?P<unit_name>(?i:{UNIT_NAMES}))\b)"
+    r"|(?P<time>(?P<hour>[01]?\d|2[0-3]):(?P<minute>[0-5]\d)(?:\s?(?P<am_pm>(?i:a\.?m\.?|p\.?m\.?)))?\b)"
+    r"|(?P<ordinal>(?P<ordinal_num>\d+)(?i:st|nd|rd|th)\b)"
+    rf"|(?P<decimal>{GROUPED_INT}\.\d+\b)"
+    r"|(?P<number>\d{1,3}(?:,\d{3})+\b|\d+\b)"
+    r")"
+    rf"|(?P<quant_min>(?P<quant>(?i:{MINUTE_QUANTIFIERS}))\s+(?i:min|mins)\b)"
+    r")"
 )
-MINIMUM_RE = re.compile(r"\bthe min\b", re.IGNORECASE)
-BIG_O_RE = re.compile(r"\bO\(([^)]+)\)", re.IGNORECASE)
+MINIMUM_RE = lazy_compile(r"\bthe min\b", re.IGNORECASE)
+BIG_O_RE = lazy_compile(r"\bO\(([^)]+)\)", re.IGNORECASE)
+
+
+def structural_patterns(include_paths):
+    # Two scans keep the precedence of the old one-kind-at-a-time passes:
+    # URLs, emails and Windows paths first, then Unix paths, handles, hashtags
+    # and big-O over the text with their span keys in place. A key counts as
+    # a word character before these tokens and ends a path segment, and "@"
+    # or "#" only continue one after a word character, where a handle or
+    # hashtag cannot start. A path start, "@" or "#" right before a key (or a
+    # path start before a handle or hashtag) is spoken on its own as a
+    # lead-in. A handle or hashtag ending in digits keeps a following ":mm"
+    # so "#10:30" is still read as a time.
+    first = [
+        r"(?P<url>(?i:https?://|www\.)[^\s<>]+)",
+        r"(?P<email>[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b)",
+        r"(?P<win_path>[A-Za-z]:\\[^\s)]+)",
+    ]
+    segment = r"(?:[^\s/@#\ue000]|(?<=[\w\ue001])[@#])+"
+    time = r"(?:(?<=\d):[0-5]\d)?"
+    second = [
+        r"(?P<lead>~?/(?=\ue000|[@#][A-Za-z0-9_])|[@#](?=\ue000))",
+        rf"(?P<unix_path>~?/(?:{segment}/)*{segment})",
+        rf"@(?P<handle>[A-Za-z0-9_]{{1,30}}{time})",
+        rf"#(?P<hashtag>[A-Za-z0-9_]+{time})",
+    ]
+    starts = "~/@#Oo"
+    if not include_paths:
+        del first[2]
+        del second[1]
+        second[0] = r"(?P<lead>[@#])(?=\ue000)"
+        starts = "@#Oo"
+    # The leading class lets the engine skip to candidate positions.
+    return (
+        lazy_compile(r"\b(?:" + "|".join(first) + ")"),
+        lazy_compile(rf"(?=[{starts}])(?<![\w\ue001])(?:" + "|".join(second) + r"|[Oo]\((?P<big_o>[^)]+)\))"),
+    )
+
+
+STRUCTURAL_PASSES = structural_patterns(True)
+STRUCTURAL_NO_PATH_PASSES = structural_patterns(False)
+LEAD_WORDS = {"/": "slash", "~/": "home slash", "@": "at", "#": "hashtag"}
+# Span keys are private-use characters: an opening mark, the index in
+# private-use digits and a closing mark. None of them are word characters,
+# so the word stages treat a key like punctuation, and input that contains
+# them has them removed before the structural scans.
+SPAN_OPEN = "\ue000"
+SPAN_CLOSE = "\ue001"
+SPAN_DIGITS = "".join(chr(0xE010 + d) for d in range(10))
+SPAN_ENCODE = str.maketrans("0123456789", SPAN_DIGITS)
+SPAN_DECODE = str.maketrans(SPAN_DIGITS, "0123456789")
+SPAN_KEY_RE = lazy_compile(r"\ue000([\ue010-\ue019]+)\ue001")
+SPAN_CHARS_RE = lazy_compile(r"[\ue000\ue001\ue010-\ue019]")
+CAMEL_RE = lazy_compile(r"([a-z])([A-Z])")
+DIGITS_RE = lazy_compile(r"\d+")
+AMPERSAND_RE = lazy_compile(r"(?<=\w)&(?=\w)")
+SLASH_RE = lazy_compile(r"(?<=[\w\ue001])/(?!\s)")
+ACRONYM_RE = lazy_compile(r"\b[A-Z]{2,6}\b")
+FORCED_KEY_RE = lazy_compile(r"[A-Z0-9+/.-]+")
+SENTENCE_END_RE = lazy_compile(r"[.!?]$")
+PAREN_RE = lazy_compile(r"\(([^)]*)\)")
+PAREN_REPLACEMENTS = {"strip": "", "unwrap": r" \1 ", "expand": r", \1"}
+BLANKS_RE = lazy_compile(r"[\t ]+")
+SPACE_BEFORE_PUNCT_RE = lazy_compile(r"\s+([.,!?])")
+MULTI_SPACE_RE = lazy_compile(r"\s{2,}")
+TAG_RE = lazy_compile(r"\[[a-z ]+\]", re.IGNORECASE)
+TAG_KEY_RE = lazy_compile(r"__TAG\d+__")
+
+# Characters whose absence lets normalize() skip a stage: every match of
+# that stage's patterns contains at least one of them.
+TRIGGER_CHARS = frozenset("@/:#&+([*\n")
+# The only ASCII characters Unicode patterns see differently from re.ASCII
+# ones: str.isspace() counts them, so Unicode \s matches them.
+UNICODE_SPACES = frozenset("\x1c\x1d\x1e\x1f")
+DIGIT_CHARS = frozenset("0123456789")
+UPPER_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+SFX_TRIGGERS = frozenset("*([")
+STRUCTURAL_TRIGGERS = frozenset(("@", "/", ":", "#", "(", "www."))
+UNTIDY_SPACING = ("  ", " .", " ,", " !", " ?")
+
+# Spoken forms of URLs, emails and paths, keyed by the raw text and the
+# config fields each one reads. Chat logs repeat the same links a lot.
+ENTITY_CACHE = LRUCache(max_entries=4096, max_bytes=4 * 1024 * 1024)
 
 EMOJI_RANGES = [
+    (0x1F1E6, 0x1F1FF),
     (0x1F300, 0x1F5FF),
     (0x1F600, 0x1F64F),
     (0x1F680, 0x1F6FF),
@@ -49,7 +149,45 @@ EMOJI_RANGES = [
     (0x1FA70, 0x1FAFF),
     (0x2600, 0x26FF),
     (0x2700, 0x27BF),
+    # Variation selectors, the keycap mark and the tag characters of
+    # subdivision flags only ever decorate an emoji.
+    (0xFE00, 0xFE0F),
+    (0x20E3, 0x20E3),
+    (0xE0020, 0xE007F),
 ]
+EMOJI_CLASS = "".join(f"{chr(start)}-{chr(end)}" for start, end in EMOJI_RANGES)
+EMOJI_RE = lazy_compile(f"[{EMOJI_CLASS}]")
+# Emoji, the zero width joiners that glue them into sequences, and lone
+# surrogates, all of which strip_emoji mode drops in one pass. Leading with
+# a plain character class lets re skip ahead to the next candidate.
+UNSPEAKABLE_RE = lazy_compile(f"[{EMOJI_CLASS}\ud800-\udfff][{EMOJI_CLASS}\ud800-\udfff\u200d]*")
+
+# fold_typography: curly quotes, dashes, ellipses and odd spaces to their
+# ASCII forms, so later stages and the TTS voice see what they expect.
+TYPOGRAPHY_TABLE = str.maketrans(
+    {
+        "\u2018": "'",
+        "\u2019": "'",
+        "\u201a": "'",
+        "\u201b": "'",
+        "\u2032": "'",
+        "\u201c": '"',
+        "\u201d": '"',
+        "\u201e": '"',
+        "\u201f": '"',
+        "\u2033": '"',
+        "\u2010": "-",
+        "\u2011": "-",
+        "\u2012": "-",
+        "\u2013": "-",
+        "\u2014": " - ",
+        "\u2015": " - ",
+        "\u2026": "...",
+        "\u00a0": " ",
+        "\u2009": " ",
+        "\u202f": " ",
+    }
+)
 
 
 ONES = [
@@ -92,30 +230,28 @@ SCALES = [
     (1_000_000_000, "billion"),
     (1_000_000, "million"),
     (1_000, "thousand"),
-    (100, "hundred"),
 ]
+NUMBER_TABLE_SIZE = 10_000
 
 
 def is_emoji(ch):
-    cp = ord(ch)
-    if cp == 0xFE0F:
-        return True
-    for start, end in EMOJI_RANGES:
-        if start <= cp <= end:
-            return True
-    return False
+    return EMOJI_RE.match(ch) is not None
 
 
 def strip_emoji(text):
-    return "".join(ch for ch in text if not is_emoji(ch))
+    return UNSPEAKABLE_RE.sub("", text)
 
 
 def spell_letters(token):
     return " ".join(ch.lower() for ch in token if ch.isalnum())
 
 
+def spell_chars(token):
+    return " ".join(ONES[int(ch)] if ch.isdecimal() else ch.lower() for ch in token if ch.isalnum())
+
+
 def split_camel(token):
-    return re.sub(r"([a-z])([A-Z])", r"\1 \2", token)
+    return CAMEL_RE.sub(r"\1 \2", token)
 
 
 def digits_to_words(digits):
@@ -124,7 +260,7 @@ def digits_to_words(digits):
 
 def decimal_to_words(num_str):
     whole, frac = num_str.split(".")
-    words = number_to_words(int(whole)) + " point "
+    words = number_to_words(int(whole.replace(",", ""))) + " point "
     words += " ".join(ONES[int(ch)] for ch in frac)
     return words
 
@@ -132,41 +268,55 @@ def decimal_to_words(num_str):
 def speak_token(token):
     token = split_camel(token)
     token = token.replace("-", " dash ").replace("_", " underscore ").replace(".", " dot ")
-    token = re.sub(r"\d+", lambda m: number_to_words(int(m.group(0))), token)
+    token = token.replace("+", " plus ").replace("&", " and ").replace("/", " slash ")
+    token = HASHTAG_RE.sub(lambda m: hashtag_to_words(m.group(1)), token).replace("#", " hash ")
+    token = DIGITS_RE.sub(lambda m: number_to_words(int(m.group(0))), token)
     return normalize_whitespace(token)
 
+# Word tables, built on first use or loaded from the artifact cache when
+# that is enabled.
+TABLES = {}
+
+
+def word_table(key, build, options=()):
+    table = TABLES.get(key)
+    if table is None:
+        table = TABLES[key] = artifacts.cached(key[0], build, options=options)
+    return table
+
+
+def number_table():
+    return word_table(("numbers",), build_number_table)
+
+
+def build_number_table():
+    table = ONES + TEENS
+    for n in range(20, 100):
+        tens, ones = divmod(n, 10)
+        table.append(TENS[tens] if ones == 0 else f"{TENS[tens]} {ONES[ones]}")
+    for scale, name in ((100, "hundred"), (1_000, "thousand")):
+        for n in range(scale, scale * 10):
+            lead, rest = divmod(n, scale)
+            words = f"{table[lead]} {name}"
+            table.append(words if rest == 0 else f"{words} {table[rest]}")
+    return table
+
+
 def number_to_words(n):
     if n < 0:
         return "minus " + number_to_words(-n)
-    if n < 10:
-        return ONES[n]
-    if n < 20:
-        return TEENS[n - 10]
-    if n < 100:
-        tens = TENS[n // 10]
-        ones = n % 10
-        if ones == 0:
-            return tens
-        return f"{tens} {ONES[ones]}"
-
+    if n < NUMBER_TABLE_SIZE:
+        return number_table()[n]
     for scale, name in SCALES:
         if n >= scale:
-            if scale == 100:
-                lead = number_to_words(n // scale)
-                rest = n % scale
-                if rest == 0:
-                    return f"{lead} {name}"
-                return f"{lead} {name} {number_to_words(rest)}"
             lead = number_to_words(n // scale)
             rest = n % scale
             if rest == 0:
                 return f"{lead} {name}"
             return f"{lead} {name} {number_to_words(rest)}"
-    return str(n)
 
 
-def ordinal_to_words(n):
-    base = number_to_words(n)
+def ordinal_suffix(base):
     if base.endswith("one"):
         return base[:-3] + "first"
     if base.endswith("two"):
@@ -186,6 +336,20 @@ def ordinal_to_words(n):
     return base + "th"
 
 
+def ordinal_table():
+    return word_table(("ordinals",), build_ordinal_table)
+
+
+def build_ordinal_table():
+    return [ordinal_suffix(words) for words in number_table()]
+
+
+def ordinal_to_words(n):
+    if 0 <= n < NUMBER_TABLE_SIZE:
+        return ordinal_table()[n]
+    return ordinal_suffix(number_to_words(n))
+
+
 def replace_ordinals(text):
     def repl(match):
         num = int(match.group(1))
@@ -195,124 +359,108 @@ def replace_ordinals(text):
 
 
 def replace_decimals(text):
-    def repl(match):
-        raw = match.group(0)
-        whole, frac = raw.split(".")
-        words = number_to_words(int(whole)) + " point "
-        words += " ".join(ONES[int(ch)] for ch in frac)
-        return words
+    return DECIMAL_RE.sub(lambda m: decimal_to_words(m.group(0)), text)
+
 
-    return DECIMAL_RE.sub(repl, text)
+def cardinal_to_words(raw):
+    raw = raw.replace(",", "")
+    try:
+        n = int(raw)
+    except ValueError:
+        return raw
+    return number_to_words(n)
 
 
 def replace_numbers(text):
-    def repl(match):
-        raw = match.group(0).replace(",", "")
-        try:
-            n = int(raw)
-        except ValueError:
-            return raw
-        return number_to_words(n)
+    return NUMBER_RE.sub(lambda m: cardinal_to_words(m.group(0)), text)
 
-    return NUMBER_RE.sub(repl, text)
+
+def big_o_to_words(inner):
+    inner = split_camel(inner.strip().replace("^", " ^ "))
+    inner = inner.replace("/", " slash ").replace("+", " plus ").replace("&", " and ")
+    return f"big o of {inner}"
 
 
 def replace_big_o(text):
-    def repl(match):
-        inner = match.group(1).strip()
-        inner = split_camel(inner.replace("^", " ^ "))
-        inner = inner.replace("/", " slash ")
-        return f"big o of {inner}"
+    return BIG_O_RE.sub(lambda m: big_o_to_words(m.group(1)), text)
 
-    return BIG_O_RE.sub(repl, text)
+
+def version_to_words(raw):
+    parts = raw.split(".")
+    words = " point ".join(number_to_words(int(p)) for p in parts)
+    return f"version {words}"
 
 
 def replace_versions(text):
-    def repl(match):
-        raw = match.group(1)
-        parts = raw.split(".")
-        words = " point ".join(number_to_words(int(p)) for p in parts)
-        return f"version {words}"
+    return VERSION_RE.sub(lambda m: version_to_words(m.group(1)), text)
+
 
-    return VERSION_RE.sub(repl, text)
+def ip_to_words(raw, digit_style):
+    spoken = []
+    for part in raw.split("."):
+        if digit_style == "single":
+            spoken.append(digits_to_words(part))
+        else:
+            spoken.append(number_to_words(int(part)))
+    return " dot ".join(spoken)
 
 
 def replace_ip_addresses(text, config):
     digit_style = config.get("ip_digit_style", "single")
+    return IP_RE.sub(lambda m: ip_to_words(m.group(0), digit_style), text)
 
-    def repl(match):
-        parts = match.group(0).split(".")
-        spoken = []
-        for part in parts:
-            if digit_style == "single":
-                spoken.append(digits_to_words(part))
-            else:
-                spoken.append(number_to_words(int(part)))
-        return " dot ".join(spoken)
 
-    return IP_RE.sub(repl, text)
+def mac_to_words(raw):
+    return " colon ".join(spell_chars(pair) for pair in raw.split(":"))
 
 
 def replace_mac_addresses(text):
-    def repl(match):
-        pairs = match.group(0).split(":")
-        spoken = []
-        for pair in pairs:
-            spoken.append(spell_letters(pair))
-        return " colon ".join(spoken)
+    return MAC_RE.sub(lambda m: mac_to_words(m.group(0)), text)
+
 
-    return MAC_RE.sub(repl, text)
+def hex_to_words(raw):
+    return "hex " + spell_chars(raw[2:])
 
 
 def replace_hex_numbers(text):
-    def repl(match):
-        raw = match.group(0)[2:]
-        return "hex " + spell_letters(raw)
+    return HEX_RE.sub(lambda m: hex_to_words(m.group(0)), text)
 
-    return HEX_RE.sub(repl, text)
+
+def unit_to_words(number, unit, unit_map):
+    unit_key = unit.lower()
+    unit_words = unit_map.get(unit_key, unit_key)
+    if "." in number:
+        number_words = decimal_to_words(number)
+    else:
+        number_words = number_to_words(int(number.replace(",", "")))
+    return f"{number_words} {unit_words}"
 
 
 def replace_units(text, config):
     unit_map = config.get("unit_pronunciations", {})
-
-    def repl(match):
-        number = match.group(1)
-        unit = match.group(2)
-        unit_key = unit.lower()
-        unit_words = unit_map.get(unit_key, unit_key)
-        if "." in number:
-            number_words = decimal_to_words(number)
-        else:
-            number_words = number_to_words(int(number))
-        return f"{number_words} {unit_words}"
-
-    return UNIT_RE.sub(repl, text)
+    return UNIT_RE.sub(lambda m: unit_to_words(m.group(1), m.group(2), unit_map), text)
 
 
 def replace_hyphen_units(text):
     return HYPHEN_UNIT_RE.sub(r"\1 \2", text)
 
 
-def replace_minute_quantifiers(text):
-    def repl(match):
-        quant = match.group(1).lower()
-        if quant in {"a", "an", "one"}:
-            return "a minute"
-        return f"{quant} minutes"
+def minute_quantifier_to_words(quant):
+    quant = quant.lower()
+    if quant in {"a", "an", "one"}:
+        return "a minute"
+    return f"{quant} minutes"
 
-    return QUANT_MIN_RE.sub(repl, text)
+
+def replace_minute_quantifiers(text):
+    return QUANT_MIN_RE.sub(lambda m: minute_quantifier_to_words(m.group(1)), text)
 
 
 def replace_minimum_phrases(text):
     return MINIMUM_RE.sub("the minimum", text)
 
 
-def time_to_words(hour, minute, am_pm, config):
-    time_style = config.get("time_style", "12h")
-    time_zero = config.get("time_zero", "oclock")
-    include_am_pm = config.get("time_include_am_pm", True)
-    leading_zero = config.get("minute_leading_zero", "oh")
-
+def spell_time(hour, minute, am_pm, time_style, time_zero, include_am_pm, leading_zero):
     if time_style == "12h":
         h = hour % 12
         if h == 0:
@@ -346,16 +494,94 @@ def time_to_words(hour, minute, am_pm, config):
     return f"{hour_words} {minute_words}"
 
 
+def time_table(time_style, time_zero, include_am_pm, leading_zero):
+    options = (time_style, time_zero, include_am_pm, leading_zero)
+    return word_table(("times",) + options, lambda: build_time_table(*options), options)
+
+
+def build_time_table(*options):
+    # One list per am/pm variant (none, am, pm), indexed by hour * 60 + minute.
+    return tuple(
+        [spell_time(hour, minute, am_pm, *options) for hour in range(24) for minute in range(60)]
+        for am_pm in (None, "am", "pm")
+    )
+
+
+def time_options(config):
+    return (
+        config.get("time_style", "12h"),
+        config.get("time_zero", "oclock"),
+        config.get("time_include_am_pm", True),
+        config.get("minute_leading_zero", "oh"),
+    )
+
+
+def time_to_words(hour, minute, am_pm, config):
+    return time_words(hour, minute, am_pm, time_options(config))
+
+
+def time_words(hour, minute, am_pm, options):
+    if 0 <= hour < 24 and 0 <= minute < 60:
+        variant = 0 if not am_pm else 1 if am_pm.startswith("a") else 2
+        return time_table(*options)[variant][hour * 60 + minute]
+    return spell_time(hour, minute, am_pm, *options)
+
+
+def clock_to_words(hour, minute, am_pm, config):
+    return clock_words(hour, minute, am_pm, time_options(config))
+
+
+def clock_words(hour, minute, am_pm, options):
+    if am_pm:
+        am_pm = am_pm.lower().replace(".", "")
+    return time_words(int(hour), int(minute), am_pm, options)
+
+
 def replace_times(text, config):
-    def repl(match):
-        hour = int(match.group(1))
-        minute = int(match.group(2))
-        am_pm = match.group(3)
-        if am_pm:
-            am_pm = am_pm.lower().replace(".", "")
-        return time_to_words(hour, minute, am_pm, config)
+    return TIME_RE.sub(lambda m: clock_to_words(m.group(1), m.group(2), m.group(3), config), text)
 
-    return TIME_RE.sub(repl, text)
+
+def numeric_options(config):
+    return config.get("ip_digit_style", "single"), config.get("unit_pronunciations", {}), time_options(config)
+
+
+def replace_numeric_entities(text, config):
+    return replace_numeric(text, *numeric_options(config))
+
+
+def replace_numeric(text, digit_style, unit_map, clock_options):
+    return NUMERIC_RE.sub(numeric_replacer(digit_style, unit_map, clock_options), text)
+
+
+def numeric_replacer(digit_style, unit_map, clock_options):
+    # One scan over the text; alternatives in NUMERIC_RE are listed in the
+    # order the individual replace_* stages used to run, so the earlier stage
+    # still wins when two entity kinds could start at the same position.
+    def repl(match):
+        kind = match.lastgroup
+        if kind == "ip":
+            return ip_to_words(match.group(0), digit_style)
+        if kind == "version":
+            return version_to_words(match.group("version_num"))
+        if kind == "mac":
+            return mac_to_words(match.group(0))
+        if kind == "hex":
+            return hex_to_words(match.group(0))
+        if kind == "hyphen_unit":
+            return unit_to_words(match.group("hyphen_num"), match.group("hyphen_name"), unit_map)
+        if kind == "quant_min":
+            return minute_quantifier_to_words(match.group("quant"))
+        if kind == "unit":
+            return unit_to_words(match.group("unit_num"), match.group("unit_name"), unit_map)
+        if kind == "time":
+            return clock_words(match.group("hour"), match.group("minute"), match.group("am_pm"), clock_options)
+        if kind == "ordinal":
+            return ordinal_to_words(int(match.group("ordinal_num")))
+        if kind == "decimal":
+            return decimal_to_words(match.group(0))
+        return cardinal_to_words(match.group(0))
+
+    return repl
 
 
 def split_trailing_punct(token):
@@ -391,6 +617,8 @@ def speak_domain(host, config):
 
 
 def url_to_words(url, config):
+    from urllib.parse import parse_qsl, unquote, urlparse
+
     include_scheme = config.get("url_include_scheme", False)
     policy = config.get("url_policy", "domain")
     read_query = config.get("url_read_query", False)
@@ -452,26 +680,61 @@ def url_to_words(url, config):
     return normalize_whitespace(" ".join(parts))
 
 
+def url_options(config):
+    return (
+        config.get("url_include_scheme", False),
+        config.get("url_policy", "domain"),
+        config.get("url_read_query", False),
+        config.get("url_read_fragment", False),
+        config.get("url_include_port", True),
+        tuple(sorted(config.get("domain_pronunciations", {}).items())),
+    )
+
+
+def cached_words(kind, raw, options, build, *args):
+    key = (kind, raw, options)
+    words = ENTITY_CACHE.get(key)
+    if words is None:
+        words = build(*args)
+        ENTITY_CACHE.put(key, words)
+    return words
+
+
+def cached_url_words(url, config, options):
+    return cached_words("url", url, options, url_to_words, url, config)
+
+
+def cached_email_words(email, config, options):
+    # Emails only read domain_pronunciations, the last url option.
+    return cached_words("email", email, options[-1], email_to_words, email, config)
+
+
+def cached_path_words(path, windows):
+    return cached_words("path", path, windows, path_to_words, path, windows)
+
+
 def replace_urls(text, config):
+    options = url_options(config)
+
     def repl(match):
-        url = match.group(0)
-        core, trailing = split_trailing_punct(url)
-        return url_to_words(core, config) + trailing
+        core, trailing = split_trailing_punct(match.group(0))
+        return cached_url_words(core, config, options) + trailing
 
     return URL_RE.sub(repl, text)
 
 
-def replace_emails(text, config):
-    def repl(match):
-        email = match.group(0)
-        local, domain = email.split("@", 1)
-        local = split_camel(local)
-        local = local.replace(".", " dot ").replace("_", " underscore ").replace("-", " dash ").replace("+", " plus ")
-        local = re.sub(r"\d+", lambda m: digits_to_words(m.group(0)), local)
-        domain_words = speak_domain(domain, config)
-        return normalize_whitespace(f"{local} at {domain_words}")
+def email_to_words(email, config):
+    local, domain = email.split("@", 1)
+    local = split_camel(local)
+    local = local.replace(".", " dot ").replace("_", " underscore ").replace("-", " dash ").replace("+", " plus ")
+    local = DIGITS_RE.sub(lambda m: digits_to_words(m.group(0)), local)
+    domain_words = speak_domain(domain, config)
+    return normalize_whitespace(f"{local} at {domain_words}")
 
-    return EMAIL_RE.sub(repl, text)
+
+def replace_emails(text, config):
+    options = url_options(config)
+    return EMAIL_RE.sub(lambda m: cached_email_words(m.group(0), config, options), text)
 
 
 def path_to_words(path, windows=False):
@@ -507,66 +770,172 @@ def replace_paths(text, config):
         return text
 
     def repl_win(match):
-        path = match.group(0)
-        core, trailing = split_trailing_punct(path)
-        return path_to_words(core, windows=True) + trailing
+        core, trailing = split_trailing_punct(match.group(0))
+        return cached_path_words(core, True) + trailing
 
     def repl_unix(match):
-        path = match.group(0)
-        core, trailing = split_trailing_punct(path)
-        return path_to_words(core, windows=False) + trailing
+        core, trailing = split_trailing_punct(match.group(0))
+        return cached_path_words(core, False) + trailing
 
     text = WIN_PATH_RE.sub(repl_win, text)
     text = UNIX_PATH_RE.sub(repl_unix, text)
     return text
 
 
-def replace_handles_hashtags(text):
-    def repl_handle(match):
-        handle = split_camel(match.group(1)).replace("_", " ")
-        return f"at {handle}"
+def handle_to_words(handle):
+    return "at " + split_camel(handle).replace("_", " ")
 
-    def repl_hash(match):
-        tag = split_camel(match.group(1)).replace("_", " ")
-        return f"hashtag {tag}"
 
-    text = HANDLE_RE.sub(repl_handle, text)
-    text = HASHTAG_RE.sub(repl_hash, text)
+def hashtag_to_words(tag):
+    return "hashtag " + split_camel(tag).replace("_", " ")
+
+
+def replace_handles_hashtags(text):
+    text = HANDLE_RE.sub(lambda m: handle_to_words(m.group(1)), text)
+    text = HASHTAG_RE.sub(lambda m: hashtag_to_words(m.group(1)), text)
     return text
 
 
+def finish_words(text, config):
+    text = replace_tech_terms(text, config)
+    text = replace_numeric_entities(text, config)
+    return auto_spell_acronyms(text, config)
+
+
+def finish_spoken(spans, finish):
+    # Structural tokens are spoken once and then protected, so they only get
+    # the word-level stages (lexicon, numbers, acronyms) applied here; "+"
+    # and "&" are spoken by speak_token and big_o_to_words. Abbreviations are
+    # not expanded in spans: a token's trailing punctuation stays outside
+    # its key, so "/etc." is read "slash etc." rather than "slash et cetera".
+    # Spans are joined with NUL so the stages run once for the whole batch.
+    if not spans:
+        return spans
+    if any("\0" in span for span in spans):
+        return [finish(span) for span in spans]
+    return finish("\0".join(spans)).split("\0")
+
+
+def protect_structural_tokens(text, config):
+    passes = STRUCTURAL_PASSES if config.get("path_policy", "speak") else STRUCTURAL_NO_PATH_PASSES
+    text, spans = extract_structural(text, passes, config)
+    return text, finish_spoken(spans, lambda span: finish_words(span, config))
+
+
+def extract_structural(text, passes, config, options=None):
+    spans = []
+    repl = structural_replacer(config, options, spans)
+    for pattern in passes:
+        text = pattern.sub(repl, text)
+    return text, spans
+
+
+def structural_replacer(config, options, spans):
+    # Speaks each structural token into spans and leaves a span key.
+    def repl(match):
+        nonlocal options
+        kind = match.lastgroup
+        trailing = ""
+        if kind == "url" or kind == "email":
+            if options is None:
+                options = url_options(config)
+            if kind == "url":
+                core, trailing = split_trailing_punct(match.group(0))
+                spoken = cached_url_words(core, config, options)
+            else:
+                spoken = cached_email_words(match.group(0), config, options)
+        elif kind == "win_path" or kind == "unix_path":
+            core, trailing = split_trailing_punct(match.group(0))
+            spoken = cached_path_words(core, kind == "win_path")
+        elif kind == "handle":
+            spoken = handle_to_words(match.group("handle"))
+        elif kind == "hashtag":
+            spoken = hashtag_to_words(match.group("hashtag"))
+        elif kind == "lead":
+            spoken = LEAD_WORDS[match.group("lead")]
+        else:
+            # The first scan may have left keys inside the parentheses.
+            inner = SPAN_KEY_RE.sub(lambda m: spans[span_index(m)], match.group("big_o"))
+            spoken = big_o_to_words(inner)
+        key = span_key(len(spans))
+        spans.append(spoken)
+        return key + trailing
+
+    return repl
+
+
+def span_key(index):
+    return SPAN_OPEN + str(index).translate(SPAN_ENCODE) + SPAN_CLOSE
+
+
+def span_index(match):
+    return int(match.group(1).translate(SPAN_DECODE))
+
+
+def restore_spans(text, spans, track=UNTRACKED):
+    if not spans:
+        return text
+
+    def repl(match):
+        # Text glued to a token ("O(n)2nd", "/a-#b") went through the word
+        # stages on its own, so its words and the token's get a space between
+        # them. A key with no span is left as it is.
+        index = span_index(match)
+        if index >= len(spans):
+            return match.group(0)
+        spoken = spans[index]
+        string, start, end = match.string, match.start(), match.end()
+        if start and (string[start - 1].isalnum() or string[start - 1] == SPAN_CLOSE):
+            spoken = " " + spoken
+        if end < len(string) and string[end].isalnum():
+            spoken += " "
+        return spoken
+
+    return track.sub(SPAN_KEY_RE, repl, text)
+
+
 def replace_tech_terms(text, config):
     tech_terms = config.get("tech_pronunciations", {})
-    for key in sorted(tech_terms.keys(), key=len, reverse=True):
-        pattern = r"(?<!\w)" + re.escape(key) + r"(?!\w)"
-        text = re.sub(pattern, tech_terms[key], text, flags=re.IGNORECASE)
-    return text
+    if not tech_terms:
+        return text
+    return compile_lexicon(tech_terms).sub(text)
 
 
 def replace_ampersands(text):
-    text = re.sub(r"(?<=\w)&(?=\w)", " and ", text)
+    text = AMPERSAND_RE.sub(" and ", text)
     text = text.replace("&", " and ")
     return text
 
 
 def replace_slashes(text):
-    return re.sub(r"(?<=\w)/(?!\s)", " slash ", text)
+    return SLASH_RE.sub(" slash ", text)
 
 
 def replace_pluses(text):
     return text.replace("+", " plus ")
 
 
-def auto_spell_acronyms(text, config):
-    if not config.get("auto_spell_acronyms", True):
-        return text
+def acronym_sets(config):
     stoplist = {w.upper() for w in config.get("acronym_stoplist", [])}
     force = {w.upper() for w in config.get("acronym_force", [])}
     for key in config.get("tech_pronunciations", {}).keys():
         key_up = key.upper()
-        if re.fullmatch(r"[A-Z0-9+/.-]+", key_up):
+        if FORCED_KEY_RE.fullmatch(key_up):
             force.add(key_up)
+    return frozenset(stoplist), frozenset(force)
+
+
+def auto_spell_acronyms(text, config):
+    if not config.get("auto_spell_acronyms", True):
+        return text
+    return spell_acronyms(text, *acronym_sets(config))
+
+
+def spell_acronyms(text, stoplist, force):
+    return ACRONYM_RE.sub(acronym_replacer(stoplist, force), text)
+
 
+def acronym_replacer(stoplist, force):
     def repl(match):
         token = match.group(0)
         token_up = token.upper()
@@ -576,80 +945,101 @@ def auto_spell_acronyms(text, config):
             return spell_letters(token)
         return token.lower()
 
-    return re.sub(r"\b[A-Z]{2,6}\b", repl, text)
+    return repl
 
 
 def normalize_bullets(text):
-    lines = text.split("\n")
-    out = []
-    bullets = []
-
-    def flush():
-        for item in bullets:
-            item = item.strip()
-            if not item:
-                continue
-            if not re.search(r"[.!?]$", item):
-                item += "."
-            out.append(item)
-        bullets.clear()
-
-    for line in lines:
-        m = BULLET_RE.match(line)
-        if m:
-            bullets.append(m.group(1))
-        else:
-            if bullets:
-                flush()
-            cleaned = line.strip()
-            if cleaned:
-                out.append(cleaned)
+    return apply_edits(text, bullet_edits(text))
 
-    if bullets:
-        flush()
 
-    return " ".join(out)
+def bullet_edits(text):
+    # Keeps the stripped content of each non-empty line, joined by single
+    # spaces; bullet items get a closing period if they lack one.
+    items = []
+    pos = 0
+    for line in text.split("\n"):
+        m = BULLET_RE.match(line)
+        start = pos + m.start(1) if m else pos
+        item = m.group(1) if m else line
+        stripped = item.strip()
+        if stripped:
+            start += len(item) - len(item.lstrip())
+            suffix = "." if m and not SENTENCE_END_RE.search(stripped) else ""
+            items.append((start, start + len(stripped), suffix))
+        pos += len(line) + 1
+
+    edits = []
+    prev_end, joiner = 0, ""
+    for start, end, suffix in items:
+        if start != prev_end or joiner:
+            edits.append((prev_end, start, joiner))
+        prev_end, joiner = end, suffix + " "
+    if prev_end != len(text) or joiner[:-1]:
+        edits.append((prev_end, len(text), joiner[:-1]))
+    return edits
 
 
 def replace_abbreviations(text, abbreviations):
-    for k, v in abbreviations.items():
-        pattern = r"(?<!\\w)" + re.escape(k) + r"(?!\\w)"
-        text = re.sub(pattern, v, text, flags=re.IGNORECASE)
-    return text
+    # Abbreviations have always matched without word boundaries, so that
+    # "etc." still expands when glued to a preceding tag like "[sigh]etc.".
+    return compile_lexicon(abbreviations, word_boundaries=False).sub(text)
+
+
+def lexicon_matcher(mapping, word_boundaries=True):
+    # None when nothing can match, which includes a lexicon of empty keys.
+    matcher = compile_lexicon(mapping, word_boundaries) if mapping else None
+    if matcher is None or matcher.pattern is None:
+        return None
+    return matcher
 
 
 def handle_parentheses(text, policy):
-    if policy == "strip":
-        return re.sub(r"\([^)]*\)", "", text)
-    if policy == "unwrap":
-        return re.sub(r"\(([^)]*)\)", r" \1 ", text)
-    if policy == "expand":
-        return re.sub(r"\(([^)]*)\)", r", \1", text)
-    return text
+    replacement = PAREN_REPLACEMENTS.get(policy)
+    if replacement is None:
+        return text
+    return PAREN_RE.sub(replacement, text)
+
+
+def normalize_whitespace(text, track=UNTRACKED, found=("non_ascii",)):
+    text = track.sub(BLANKS_RE, " ", text)
+    text = track.sub(scan_pattern(SPACE_BEFORE_PUNCT_RE, found), r"\1", text)
+    text = track.sub(scan_pattern(MULTI_SPACE_RE, found), " ", text)
+    return track.strip(text)
 
 
-def normalize_whitespace(text):
-    text = re.sub(r"[\t ]+", " ", text)
-    text = re.sub(r"\s+([.,!?])", r"\1", text)
-    text = re.sub(r"\s{2,}", " ", text)
-    return text.strip()
+def sfx_tag_map(allowed_tags):
+    return {t.strip("[]").lower(): t for t in allowed_tags}
 
 
 def convert_explicit_sfx(text, allowed_tags):
-    allowed = {t.strip("[]").lower(): t for t in allowed_tags}
+    return replace_explicit_sfx(text, sfx_tag_map(allowed_tags))
 
+
+def replace_explicit_sfx(text, allowed):
+    return SFX_RE.sub(sfx_replacer(allowed), text)
+
+
+def sfx_replacer(allowed):
     def repl(match):
         key = match.group(2).lower().replace("  ", " ").strip()
         key = key.replace("  ", " ")
         return allowed.get(key, "")
 
-    return SFX_RE.sub(repl, text)
+    return repl
 
 
 def protect_tags(text, allowed_tags):
-    allowed = set(allowed_tags)
+    return protect_allowed_tags(text, set(allowed_tags))
+
+
+def protect_allowed_tags(text, allowed):
     placeholders = {}
+    return TAG_RE.sub(tag_replacer(allowed, placeholders), text), placeholders
 
+
+def tag_replacer(allowed, placeholders):
+    # Swaps allowed tags for __TAGn__ keys recorded in placeholders and drops
+    # any other bracketed tag.
     def repl(match):
         tag = match.group(0)
         if tag in allowed:
@@ -658,59 +1048,218 @@ def protect_tags(text, allowed_tags):
             return key
         return ""
 
-    text = re.sub(r"\[[a-z ]+\]", repl, text, flags=re.IGNORECASE)
-    return text, placeholders
+    return repl
+
+
+def text_census(text):
+    # One pass over the characters: which trigger characters occur, plus
+    # "digit" (any character \d matches), "upper" (any ASCII capital, so a
+    # superset of acronym runs), "non_ascii" (text that needs the Unicode
+    # patterns, see scan_pattern), and "min" and "www." found
+    # case-insensitively.
+    chars = set(text)
+    found = chars & TRIGGER_CHARS
+    if not chars.isdisjoint(UPPER_CHARS):
+        found.add("upper")
+    if not text.isascii() or not chars.isdisjoint(UNICODE_SPACES):
+        found.add("non_ascii")
+        # Unicode \d also matches other scripts' digits ("١٢").
+        if any(ch.isdigit() for ch in chars):
+            found.add("digit")
+    elif not chars.isdisjoint(DIGIT_CHARS):
+        found.add("digit")
+    lowered = text.lower()
+    if "min" in lowered:
+        found.add("min")
+    if "www." in lowered:
+        found.add("www.")
+    return found
+
+
+# Weakly keyed, so the twins of lexicon patterns go when their matcher does.
+# A pattern that has no twin maps to False rather than to itself, which
+# would keep it alive.
+ASCII_TWINS = WeakKeyDictionary()
+
+
+def scan_pattern(pattern, found):
+    # Most text is plain ASCII, and there a pattern compiled with re.ASCII
+    # finds exactly the same matches as the Unicode one, only faster.
+    # Patterns with non-ASCII literals keep Unicode case folding.
+    if "non_ascii" in found:
+        return pattern
+    twin = ASCII_TWINS.get(pattern)
+    if twin is None:
+        twin = ascii_variant(pattern) if pattern.pattern.isascii() else False
+        ASCII_TWINS[pattern] = twin
+    return twin or pattern
+
+
+def is_tidy(text):
+    # For text with an empty census (one ASCII line): True when bullets and
+    # whitespace normalization would leave it unchanged. isprintable() rules
+    # out every ASCII whitespace character except the plain space.
+    return (
+        text.isprintable()
+        and text == text.strip()
+        and not text.startswith("-")
+        and not any(spacing in text for spacing in UNTIDY_SPACING)
+    )
+
+
+def restore_tags(text, placeholders, track=UNTRACKED):
+    # One pass over the text whatever the number of tags.
+    if not placeholders:
+        return text
+    return track.sub(TAG_KEY_RE, lambda m: placeholders.get(m.group(0), m.group(0)), text)
+
+
+class Normalizer:
+    # A config compiled once: matchers, lookup sets and replacement callables
+    # are ready, so normalize() does no per-call setup. The config is copied,
+    # so later changes to the caller's dict do not leak in.
+    __slots__ = (
+        "config",
+        "sfx_repl",
+        "allowed_tags",
+        "structural",
+        "url_options",
+        "paren_replacement",
+        "abbreviations",
+        "tech_terms",
+        "numeric_repl",
+        "acronym_repl",
+        "strip_emoji",
+        "fold_typography",
+    )
+
+    def __init__(self, config):
+        config = deepcopy(config)
+        self.config = config
+        allowed_tags = config.get("allowed_tags", [])
+        self.sfx_repl = sfx_replacer(sfx_tag_map(allowed_tags))
+        self.allowed_tags = frozenset(allowed_tags)
+        self.structural = STRUCTURAL_PASSES if config.get("path_policy", "speak") else STRUCTURAL_NO_PATH_PASSES
+        self.url_options = url_options(config)
+        self.paren_replacement = PAREN_REPLACEMENTS.get(config.get("paren_policy", "strip"))
+        abbreviations = config.get("abbreviations", {})
+        self.abbreviations = lexicon_matcher(abbreviations, word_boundaries=False)
+        tech_terms = config.get("tech_pronunciations", {})
+        self.tech_terms = lexicon_matcher(tech_terms)
+        self.numeric_repl = numeric_replacer(*numeric_options(config))
+        self.acronym_repl = acronym_replacer(*acronym_sets(config)) if config.get("auto_spell_acronyms", True) else None
+        self.strip_emoji = config.get("strip_emoji", True)
+        self.fold_typography = config.get("fold_typography", False)
+
+    def finish_words(self, text):
+        if self.tech_terms is not None:
+            text = self.tech_terms.sub(text)
+        text = NUMERIC_RE.sub(self.numeric_repl, text)
+        if self.acronym_repl is not None:
+            text = ACRONYM_RE.sub(self.acronym_repl, text)
+        return text
 
+    def replace_lexicons(self, text, found, track=UNTRACKED):
+        if self.abbreviations is not None:
+            text = track.sub(scan_pattern(self.abbreviations.pattern, found), self.abbreviations.repl, text)
+        if self.tech_terms is not None:
+            text = track.sub(scan_pattern(self.tech_terms.pattern, found), self.tech_terms.repl, text)
+        return text
 
-def restore_tags(text, placeholders):
-    for key, tag in placeholders.items():
-        text = text.replace(key, tag)
-    return text
+    def normalize_with_offsets(self, text):
+        # Also returns a SourceMap from the output back to offsets in text.
+        source_map = SourceMap(len(text))
+        return self.normalize(text, source_map), source_map
+
+    def normalize(self, text, track=UNTRACKED):
+        # Every stage goes through track: plain re.sub by default, or a
+        # SourceMap that follows each replacement back to the source.
+        #
+        # Stages whose trigger characters are missing from the census are
+        # skipped; the census is retaken after a stage that inserts text from
+        # the config (sfx tags, lexicon values), since that text is arbitrary.
+        if "\r" in text:
+            text = track.replace(track.replace(text, "\r\n", "\n"), "\r", "\n")
+        if self.fold_typography and not text.isascii():
+            text = track.translate(text, TYPOGRAPHY_TABLE)
+        found = text_census(text)
+        if not found and is_tidy(text) and self.replace_lexicons(text, found) == text:
+            # Already sayable: no stage would change it.
+            return text
+
+        if not found.isdisjoint(SFX_TRIGGERS):
+            replaced = track.sub(scan_pattern(SFX_RE, found), self.sfx_repl, text)
+            if replaced != text:
+                text = replaced
+                found = text_census(text)
+        text = track.apply(text, bullet_edits(text))
+
+        placeholders = {}
+        if "[" in found:
+            text = track.sub(scan_pattern(TAG_RE, found), tag_replacer(self.allowed_tags, placeholders), text)
+
+        spans = []
+        if not found.isdisjoint(STRUCTURAL_TRIGGERS):
+            if "non_ascii" in found:
+                text = track.sub(SPAN_CHARS_RE, "", text)
+            repl = structural_replacer(self.config, self.url_options, spans)
+            for pattern in self.structural:
+                text = track.sub(scan_pattern(pattern, found), repl, text)
+            spans = finish_spoken(spans, self.finish_words)
+
+        if self.paren_replacement is not None and "(" in found:
+            text = track.sub(PAREN_RE, self.paren_replacement, text)
+
+        replaced = self.replace_lexicons(text, found, track)
+        if replaced != text:
+            text = replaced
+            found = text_census(text)
+        if "&" in found:
+            text = track.replace(text, "&", " and ")
+        if "+" in found:
+            text = track.replace(text, "+", " plus ")
+        if "/" in found:
+            text = track.sub(scan_pattern(SLASH_RE, found), " slash ", text)
+        if "digit" in found or ":" in found or "min" in found:
+            text = track.sub(scan_pattern(NUMERIC_RE, found), self.numeric_repl, text)
+        if "min" in found:
+            text = track.sub(scan_pattern(MINIMUM_RE, found), "the minimum", text)
+        if self.acronym_repl is not None and "upper" in found:
+            text = track.sub(scan_pattern(ACRONYM_RE, found), self.acronym_repl, text)
+        text = restore_spans(text, spans, track)
+
+        # Spans can bring non-ASCII back in (unquoted URL paths), so this
+        # checks the text itself; isascii() is constant time.
+        if not text.isascii():
+            found.add("non_ascii")
+            if self.strip_emoji:
+                text = track.sub(UNSPEAKABLE_RE, "", text)
+
+        text = normalize_whitespace(text, track, found)
+        return restore_tags(text, placeholders, track)
+
+
+# Compiled normalizers for the config dicts normalize_text has seen, keyed
+# by id() and checked against the compiled copy, so a dict that is changed
+# in place is recompiled. That check walks the whole config (lexicons
+# included) on every call, which is why normalize_text is only the
+# convenience entry point: the CLI, batch, server and daemon paths all hold
+# a Normalizer (through CompiledPipeline) and never pay for it.
+NORMALIZER_CACHE = LRUCache(max_entries=16, max_bytes=1 << 30)
+
+
+def compile_normalizer(config):
+    key = id(config)
+    normalizer = NORMALIZER_CACHE.get(key)
+    if normalizer is None or normalizer.config != config:
+        normalizer = Normalizer(config)
+        NORMALIZER_CACHE.put(key, normalizer)
+    return normalizer
 
 
 def normalize_text(text, config):
-    text = text.replace("\r\n", "\n").replace("\r", "\n")
-    text = convert_explicit_sfx(text, config.get("allowed_tags", []))
-    text = normalize_bullets(text)
+    return compile_normalizer(config).normalize(text)
 
-    text, placeholders = protect_tags(text, config.get("allowed_tags", []))
 
-    text = replace_urls(text, config)
-    text = replace_emails(text, config)
-    text = replace_paths(text, config)
-    text = replace_handles_hashtags(text)
-    text = replace_big_o(text)
-
-    paren_policy = config.get("paren_policy", "strip")
-    text = handle_parentheses(text, paren_policy)
-
-    abbreviations = config.get("abbreviations", {})
-    if abbreviations:
-        text = replace_abbreviations(text, abbreviations)
-
-    text = replace_tech_terms(text, config)
-    text = replace_ampersands(text)
-    text = replace_pluses(text)
-    text = replace_slashes(text)
-    text = replace_ip_addresses(text, config)
-    text = replace_versions(text)
-    text = replace_mac_addresses(text)
-    text = replace_hex_numbers(text)
-    text = replace_hyphen_units(text)
-    text = replace_minute_quantifiers(text)
-    text = replace_units(text, config)
-
-    text = replace_times(text, config)
-    text = replace_ordinals(text)
-    text = replace_decimals(text)
-    text = replace_numbers(text)
-    text = replace_minimum_phrases(text)
-    text = auto_spell_acronyms(text, config)
-
-    if config.get("strip_emoji", True):
-        text = strip_emoji(text)
-        text = "".join(ch for ch in text if unicodedata.category(ch) != "Cs")
-
-    text = normalize_whitespace(text)
-    text = restore_tags(text, placeholders)
-    return text
+def normalize_with_offsets(text, config):
+    return compile_normalizer(config).normalize_with_offsets(text)
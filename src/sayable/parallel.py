@@ -0,0 +1,93 @@
+import multiprocessing
+import os
+
+from .pipeline import init_worker, worker_process
+from .stream import BlockSplitter, ends_sentence, starts_with_punctuation
+
+PIECES_PER_JOB = 4
+MIN_PIECE_CHARS = 16384
+
+
+def split_document(text, piece_chars):
+    # Pieces of at least piece_chars, cut only where stream mode would cut:
+    # sentence and paragraph breaks, outside parentheses and bullet lines.
+    splitter = BlockSplitter(max_chars=len(text) + 1)
+    blocks = splitter.feed(text)
+    blocks.append(splitter.close())
+    pieces = []
+    current = []
+    size = 0
+    for block in blocks:
+        current.append(block)
+        size += len(block)
+        if size >= piece_chars:
+            pieces.append("".join(current))
+            current = []
+            size = 0
+    if current:
+        pieces.append("".join(current))
+    return pieces
+
+
+def merge_open_pieces(pieces, outs):
+    # As in stream_process, a piece whose output does not end a sentence
+    # (e.g. "Dr." became "doctor") is joined with the one after it. One whose
+    # output starts with punctuation is joined with the one before it, which
+    # normalize_whitespace would have glued it to.
+    merged = []
+    pending = []
+    for piece, out in zip(pieces, outs):
+        if not pending and merged and starts_with_punctuation(out):
+            pending = merged.pop()
+        pending.append((piece, out))
+        if ends_sentence(out):
+            merged.append(pending)
+            pending = []
+    if pending:
+        merged.append(pending)
+    return merged
+
+
+def map_pieces(pool, pieces):
+    if pool is None:
+        return [worker_process(piece) for piece in pieces]
+    return pool.map(worker_process, pieces, chunksize=1)
+
+
+def process_document(
+    text,
+    jobs=None,
+    config_path=None,
+    overrides=None,
+    model_path=None,
+    cache_path=None,
+    cache_size=None,
+):
+    # Same result as processing text in one call, with the pieces normalized
+    # and tagged in a pool of jobs processes.
+    jobs = jobs or os.cpu_count() or 1
+    pieces = split_document(text, max(MIN_PIECE_CHARS, len(text) // (jobs * PIECES_PER_JOB)))
+    initargs = (config_path, overrides, model_path, cache_path, cache_size)
+    if jobs == 1 or len(pieces) == 1:
+        init_worker(*initargs)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(min(jobs, len(pieces)), init_worker, initargs)
+
+    try:
+        outs = map_pieces(pool, pieces)
+        while True:
+            groups = merge_open_pieces(pieces, outs)
+            if len(groups) == len(pieces):
+                break
+            pieces = ["".join(piece for piece, _ in group) for group in groups]
+            rerun = [i for i, group in enumerate(groups) if len(group) > 1]
+            outs = [group[0][1] for group in groups]
+            for i, out in zip(rerun, map_pieces(pool, [pieces[i] for i in rerun])):
+                outs[i] = out
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    return " ".join(out for piece, out in zip(pieces, outs) if out and piece.strip())
@@ -0,0 +1,203 @@
+import os
+import threading
+import time
+
+from . import artifacts
+from .cache import LRUCache
+from .config import load_config
+from .normalizer import Normalizer, normalize_text
+from .tagger import insert_tags
+
+
+def load_classifier(model_path=None):
+    from .classifier import NaiveBayesTagger
+
+    if not model_path:
+        return NaiveBayesTagger()
+    from .modelfile import is_binary_model
+
+    if is_binary_model(model_path):
+        # Already compact and mapped, not worth a pickled copy.
+        return NaiveBayesTagger.from_binary(model_path)
+    model = artifacts.cached("model", lambda: NaiveBayesTagger.from_json(model_path).model, sources=(model_path,))
+    return NaiveBayesTagger(model=model)
+
+
+def load_base_config(config_path=None):
+    return artifacts.cached("config", lambda: load_config(config_path), sources=(config_path,))
+
+
+def load_pipeline(config_path=None, overrides=None, model_path=None):
+    # The tagger is only loaded when tagging is on; insert_tags and the
+    # result store never look at it otherwise.
+    cfg = load_base_config(config_path)
+    if overrides:
+        cfg.update(overrides)
+    classifier = load_classifier(model_path) if cfg.get("tagger_enabled", True) else None
+    return cfg, classifier
+
+
+def process_text(text, config, classifier):
+    text = normalize_text(text, config)
+    return insert_tags(text, classifier, config)
+
+
+def file_stamp(path):
+    if not path:
+        return None
+    st = os.stat(path)
+    return path, st.st_mtime_ns, st.st_size
+
+
+def config_fingerprint(config):
+    import hashlib
+    import json
+
+    payload = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CompiledPipeline:
+    __slots__ = ("config", "normalizer", "classifier", "result_key")
+
+    def __init__(self, config, classifier):
+        self.normalizer = Normalizer(config)
+        self.config = self.normalizer.config
+        self.classifier = classifier
+        self.result_key = None
+
+    def normalize(self, text):
+        return self.normalizer.normalize(text)
+
+    def normalize_with_offsets(self, text):
+        return self.normalizer.normalize_with_offsets(text)
+
+    def tag(self, text):
+        return insert_tags(text, self.classifier, self.config)
+
+    def process(self, text, store=None):
+        if store is None:
+            return self.tag(self.normalize(text))
+        if self.result_key is None:
+            from .store import fingerprint
+
+            self.result_key = fingerprint(self.config, self.classifier)
+        out = store.get(self.result_key, text)
+        if out is None:
+            out = self.tag(self.normalize(text))
+            store.put(self.result_key, text, out)
+        return out
+
+
+class PipelinePool:
+    # Compiled pipelines shared by requests with different configs. A request
+    # (config file, model file, overrides) maps to the fingerprint of the
+    # config it produces, so different overrides that end up with the same
+    # config share one entry. Lexicon matchers and time tables are cached
+    # separately, so a new entry rebuilds only what its overrides change.
+    def __init__(self, max_entries=64):
+        self.entries = LRUCache(max_entries=max_entries, max_bytes=1 << 40)
+        self.requests = LRUCache(max_entries=max_entries * 4)
+        self.configs = LRUCache(max_entries=16, max_bytes=1 << 40)
+        self.models = LRUCache(max_entries=8, max_bytes=1 << 40)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.compile_seconds = 0.0
+
+    def get(self, overrides=None, config_path=None, model_path=None):
+        config_stamp = file_stamp(config_path)
+        model_stamp = file_stamp(model_path)
+        import json
+
+        request = (config_stamp, model_stamp, json.dumps(overrides or {}, sort_keys=True, default=str))
+        key = self.requests.get(request)
+        pipeline = self.entries.get(key) if key is not None else None
+        if pipeline is None:
+            config = self.base_config(config_path, config_stamp)
+            if overrides:
+                config.update(overrides)
+            key = (config_fingerprint(config), model_stamp)
+            pipeline = self.entries.get(key)
+            if pipeline is None:
+                start = time.perf_counter()
+                classifier = self.classifier(model_path, model_stamp) if config.get("tagger_enabled", True) else None
+                pipeline = CompiledPipeline(config, classifier)
+                with self.lock:
+                    self.misses += 1
+                    self.compile_seconds += time.perf_counter() - start
+                self.entries.put(key, pipeline)
+                self.requests.put(request, key)
+                return pipeline
+            self.requests.put(request, key)
+        with self.lock:
+            self.hits += 1
+        return pipeline
+
+    def base_config(self, config_path, stamp):
+        config = self.configs.get(stamp)
+        if config is None:
+            config = load_base_config(config_path)
+            self.configs.put(stamp, config)
+        # Shallow copy: overrides replace whole keys, and Normalizer takes its
+        # own deep copy.
+        return dict(config)
+
+    def classifier(self, model_path, stamp):
+        classifier = self.models.get(stamp)
+        if classifier is None:
+            classifier = load_classifier(model_path)
+            self.models.put(stamp, classifier)
+        return classifier
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.entries.stats()["evictions"],
+                "compile_seconds": self.compile_seconds,
+                "avg_compile_ms": self.compile_seconds * 1000 / self.misses if self.misses else 0.0,
+            }
+
+
+def open_store(cache_path, cache_size=None):
+    if not cache_path:
+        return None
+    from .store import DEFAULT_MAX_BYTES, ResultStore
+
+    return ResultStore(cache_path, cache_size or DEFAULT_MAX_BYTES)
+
+
+def make_processor(config, classifier, store=None):
+    pipeline = CompiledPipeline(config, classifier)
+    return lambda text: pipeline.process(text, store)
+
+
+_worker = None
+
+
+def init_worker(config_path=None, overrides=None, model_path=None, cache_path=None, cache_size=None):
+    # Pool initializer: each worker process loads the config and model once,
+    # and opens its own connection to the result cache if there is one.
+    # Per-request overrides are compiled on demand and kept in a pool.
+    global _worker
+    pool = PipelinePool()
+    pool.get(overrides, config_path, model_path)
+    _worker = (pool, config_path, overrides or {}, model_path, open_store(cache_path, cache_size))
+
+
+def worker_pipeline(overrides=None):
+    pool, config_path, base, model_path, _ = _worker
+    if overrides:
+        overrides = dict(base, **overrides)
+    else:
+        overrides = base
+    return pool.get(overrides, config_path, model_path)
+
+
+def worker_process(text, overrides=None):
+    return worker_pipeline(overrides).process(text, _worker[4])
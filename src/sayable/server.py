@@ -0,0 +1,170 @@
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+
+from .config import check_overrides
+from .pipeline import init_worker, worker_pipeline, worker_process
+
+MAX_BODY = 8 * 1024 * 1024
+
+
+def run_stage(stage, text, overrides=None, offsets=False):
+    if stage == "normalize":
+        if offsets:
+            text, source_map = worker_pipeline(overrides).normalize_with_offsets(text)
+            return {"text": text, "offsets": source_map.segments()}
+        return {"text": worker_pipeline(overrides).normalize(text)}
+    if stage == "tag":
+        return {"text": worker_pipeline(overrides).tag(text)}
+    return {"text": worker_process(text, overrides)}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message=None):
+        super().__init__(message or status.phrase)
+        self.status = status
+
+
+class Server:
+    routes = {"/normalize": "normalize", "/tag": "tag", "/process": "process"}
+
+    def __init__(
+        self,
+        config_path=None,
+        overrides=None,
+        model_path=None,
+        workers=None,
+        cache_path=None,
+        cache_size=None,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=init_worker,
+            initargs=(config_path, overrides, model_path, cache_path, cache_size),
+        )
+
+    async def start(self, host="127.0.0.1", port=8080):
+        # Warm the pool so the first requests do not pay for worker startup
+        # and model loading.
+        loop = asyncio.get_running_loop()
+        warmups = [loop.run_in_executor(self.executor, run_stage, "process", "") for _ in range(self.workers)]
+        await asyncio.gather(*warmups)
+        return await asyncio.start_server(self.handle, host, port)
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, path, version, headers, body = request
+                try:
+                    status, payload = await self.dispatch(method, path, body)
+                except HTTPError as exc:
+                    status, payload = exc.status, {"error": str(exc)}
+                except Exception as exc:
+                    # A failed stage or a broken worker pool; the client still
+                    # gets an answer and the connection handler lives on.
+                    print(f"sayable serve: {method} {path}: {exc!r}", file=sys.stderr, flush=True)
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "internal server error"}
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except HTTPError as exc:
+            write_response(writer, exc.status, {"error": str(exc)}, False)
+        except ValueError:
+            # StreamReader.readline on a line over its limit.
+            write_response(writer, HTTPStatus.BAD_REQUEST, {"error": "malformed request"}, False)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, path, body):
+        path = path.split("?", 1)[0]
+        if path == "/health":
+            return HTTPStatus.OK, {"status": "ok"}
+        stage = self.routes.get(path)
+        if stage is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND)
+        if method != "POST":
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED)
+        try:
+            data = json.loads(body)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "body must be JSON") from None
+        if not isinstance(data, dict) or not isinstance(data.get("text"), str):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "body needs a string 'text' field")
+        overrides = data.get("config")
+        if overrides is not None and not isinstance(overrides, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "'config' must be an object of config overrides")
+        try:
+            check_overrides(overrides or {})
+        except ValueError as exc:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, str(exc)) from None
+        offsets = data.get("offsets", False)
+        if offsets and stage != "normalize":
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "'offsets' is only available on /normalize")
+        loop = asyncio.get_running_loop()
+        payload = await loop.run_in_executor(self.executor, run_stage, stage, data["text"], overrides, bool(offsets))
+        return HTTPStatus.OK, payload
+
+
+async def read_request(reader):
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    try:
+        method, path, version = line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST) from None
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST) from None
+    if length < 0:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "negative Content-Length")
+    if length > MAX_BODY:
+        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+    body = await reader.readexactly(length) if length else b""
+    return method, path, version, headers, body
+
+
+def write_response(writer, status, payload, keep_alive):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+
+
+async def serve_forever(host, port, **kwargs):
+    server = Server(**kwargs)
+    try:
+        listener = await server.start(host, port)
+        addr = listener.sockets[0].getsockname()
+        print(f"sayable serve: listening on http://{addr[0]}:{addr[1]}", flush=True)
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
@@ -0,0 +1,131 @@
+from itertools import groupby
+
+
+def apply_edits(text, edits):
+    # edits: sorted, non-overlapping (start, end, replacement) over text.
+    pieces = []
+    pos = 0
+    for start, end, replacement in edits:
+        pieces.append(text[pos:start])
+        pieces.append(replacement)
+        pos = end
+    pieces.append(text[pos:])
+    return "".join(pieces)
+
+
+def strip_edits(text):
+    stripped = text.lstrip()
+    edits = []
+    if len(stripped) != len(text):
+        edits.append((0, len(text) - len(stripped), ""))
+    trailing = len(stripped) - len(stripped.rstrip())
+    if trailing:
+        edits.append((len(text) - trailing, len(text), ""))
+    return edits
+
+
+def replace_edits(text, old, new):
+    edits = []
+    pos = text.find(old)
+    while pos != -1:
+        edits.append((pos, pos + len(old), new))
+        pos = text.find(old, pos + len(old))
+    return edits
+
+
+def translate_edits(text, table):
+    return [(i, i + 1, table[ord(ch)] or "") for i, ch in enumerate(text) if ord(ch) in table]
+
+
+class Untracked:
+    # Runs the normalizer stages with no bookkeeping.
+    __slots__ = ()
+
+    def sub(self, pattern, repl, text):
+        return pattern.sub(repl, text)
+
+    def replace(self, text, old, new):
+        return text.replace(old, new)
+
+    def strip(self, text):
+        return text.strip()
+
+    def translate(self, text, table):
+        return text.translate(table)
+
+    def apply(self, text, edits):
+        return apply_edits(text, edits)
+
+
+UNTRACKED = Untracked()
+
+
+class SourceMap:
+    # Where each character of the working text came from in the source.
+    # Copied characters keep their own offset; every character of a
+    # replacement points at the whole source range it replaced, and text
+    # inserted between characters at an empty range.
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, length):
+        self.starts = list(range(length))
+        self.ends = list(range(1, length + 1))
+
+    def sub(self, pattern, repl, text):
+        if isinstance(repl, str):
+            return self.apply(text, [(m.start(), m.end(), m.expand(repl)) for m in pattern.finditer(text)])
+        return self.apply(text, [(m.start(), m.end(), repl(m)) for m in pattern.finditer(text)])
+
+    def replace(self, text, old, new):
+        return self.apply(text, replace_edits(text, old, new))
+
+    def strip(self, text):
+        return self.apply(text, strip_edits(text))
+
+    def translate(self, text, table):
+        return self.apply(text, translate_edits(text, table))
+
+    def apply(self, text, edits):
+        if not edits:
+            return text
+        starts, ends = self.starts, self.ends
+        new_starts = []
+        new_ends = []
+        pos = 0
+        for start, end, replacement in edits:
+            new_starts += starts[pos:start]
+            new_ends += ends[pos:start]
+            if end > start:
+                origin, until = starts[start], ends[end - 1]
+            else:
+                origin = until = ends[start - 1] if start else 0
+            new_starts += [origin] * len(replacement)
+            new_ends += [until] * len(replacement)
+            pos = end
+        new_starts += starts[pos:]
+        new_ends += ends[pos:]
+        self.starts, self.ends = new_starts, new_ends
+        return apply_edits(text, edits)
+
+    def source_span(self, start, end):
+        # Source range behind output[start:end].
+        if end > start:
+            return self.starts[start], self.ends[end - 1]
+        point = self.ends[start - 1] if start else 0
+        return point, point
+
+    def segments(self):
+        # The output as runs (out_start, out_end, src_start, src_end): either
+        # copied source text, same length on both sides, or one replacement.
+        runs = []
+        out = 0
+        for (start, end), group in groupby(zip(self.starts, self.ends)):
+            size = sum(1 for _ in group)
+            copied = size == 1 and end == start + 1
+            if copied and runs and runs[-1][4] and runs[-1][3] == start:
+                runs[-1][1] += 1
+                runs[-1][3] = end
+            else:
+                runs.append([out, out + size, start, end, copied])
+            out += size
+        return [tuple(run[:4]) for run in runs]
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import sqlite3
+import time
+
+from .artifacts import build_id
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+EVICT_EVERY = 256
+
+# Row overhead added to the key and output sizes when budgeting.
+ROW_OVERHEAD = 64
+
+# size_total keeps the running payload size so eviction never has to scan
+# the table; the triggers keep it right for every writer process.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    output TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_used ON results (used);
+CREATE TABLE IF NOT EXISTS size_total (bytes INTEGER NOT NULL);
+INSERT INTO size_total (bytes) SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM size_total);
+CREATE TRIGGER IF NOT EXISTS results_added AFTER INSERT ON results
+BEGIN
+    UPDATE size_total SET bytes = bytes + NEW.size;
+END;
+CREATE TRIGGER IF NOT EXISTS results_removed AFTER DELETE ON results
+BEGIN
+    UPDATE size_total SET bytes = bytes - OLD.size;
+END;
+"""
+
+
+def fingerprint(config, classifier):
+    # Everything that can change the output: the effective config, the model
+    # when tagging is on, and the installed sources.
+    model = classifier.identity() if config.get("tagger_enabled", True) else None
+    payload = json.dumps({"config": config, "model": model, "build": build_id()}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultStore:
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES, timeout=10.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("BEGIN IMMEDIATE;" + SCHEMA + "COMMIT;")
+
+    def key(self, fingerprint, text):
+        data = f"{fingerprint}\0{text}".encode("utf-8", "surrogatepass")
+        return hashlib.sha256(data).hexdigest()
+
+    def get(self, fingerprint, text):
+        key = self.key(fingerprint, text)
+        try:
+            row = self.conn.execute("SELECT output FROM results WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self.conn.execute("UPDATE results SET used = ? WHERE key = ?", (time.time(), key))
+        except sqlite3.Error:
+            row = None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def put(self, fingerprint, text, output):
+        # The cache is best-effort: a locked or full database never fails the
+        # caller, the result is just not stored. A key always maps to the same
+        # output, so an existing row is left alone.
+        key = self.key(fingerprint, text)
+        try:
+            size = len(key) + len(output.encode("utf-8")) + ROW_OVERHEAD
+            self.conn.execute(
+                "INSERT OR IGNORE INTO results (key, output, size, used) VALUES (?, ?, ?, ?)",
+                (key, output, size, time.time()),
+            )
+        except (sqlite3.Error, UnicodeEncodeError):
+            return
+        self.writes += 1
+        if self.writes % EVICT_EVERY == 0:
+            self.evict()
+
+    def used_bytes(self):
+        return self.conn.execute("SELECT bytes FROM size_total").fetchone()[0]
+
+    def evict(self):
+        # Drop least recently used rows until the stored results fit in 90% of
+        # the budget; freed pages are reused by later inserts.
+        try:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                excess = self.used_bytes() - self.max_bytes * 0.9
+                doomed = []
+                if excess > 0:
+                    for key, size in self.conn.execute("SELECT key, size FROM results ORDER BY used"):
+                        doomed.append((key,))
+                        excess -= size
+                        if excess <= 0:
+                            break
+                    self.conn.executemany("DELETE FROM results WHERE key = ?", doomed)
+                self.conn.execute("COMMIT")
+            except sqlite3.Error:
+                self.conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error:
+            pass
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        self.evict()
+        self.conn.close()
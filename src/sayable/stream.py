@@ -0,0 +1,198 @@
+import codecs
+import re
+
+from .lazyre import lazy_compile
+from .normalizer import BULLET_RE
+
+# A break needs the next character in view. Inside a line, text starting
+# with a dash, star, bullet or digit could read as a bullet marker on its
+# own; and a leading "(" would be rewritten to ", " and glued to the
+# previous sentence by normalize_whitespace, as is leading punctuation
+# (SPACE_BEFORE_PUNCT_RE).
+SENTENCE_BREAK_RE = lazy_compile(r"(?<=[.!?])[ \t]+(?=[^\s\d*\-\u2022(.,!?])|\n(?=[^\s(.,!?])")
+# The same holds for a line that starts with them once bullet markers and
+# empty lines are dropped; a marker at the end of the buffer may still
+# become one.
+GLUED_LINE_RE = lazy_compile(r"(?:\s|[-*\u2022](?=\s|\Z)|\d+[.)](?=\s|\Z))*(?:\d+\Z|[(.,!?]|\Z)")
+SENTENCE_END = ".!?"
+# Punctuation opening an output, possibly after the tags the tagger puts in
+# front of a sentence.
+LEADING_PUNCT_RE = lazy_compile(r"(?:\[[a-z ]+\] )*[.,!?]", re.IGNORECASE)
+# Parentheses the paren stage never sees: bullet markers like "2)" are gone
+# by then, and big-O tokens and URLs have been spoken.
+PAREN_FREE_RE = lazy_compile(
+    r"^[ \t]*\d+\)(?=\s|\Z)|\b[Oo]\([^)]+\)|\b(?i:https?://|www\.)[^\s<>]+",
+    re.MULTILINE,
+)
+
+
+def read_chunks(stream, size=4096, encoding="utf-8"):
+    # read1 returns whatever is available instead of waiting for a full
+    # buffer, which is what keeps latency tied to the producer.
+    raw = getattr(stream, "buffer", stream)
+    if hasattr(raw, "read1"):
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        while True:
+            data = raw.read1(size)
+            if not data:
+                tail = decoder.decode(b"", final=True)
+                if tail:
+                    yield tail
+                return
+            text = decoder.decode(data)
+            if text:
+                yield text
+    else:
+        while True:
+            text = stream.read(size)
+            if not text:
+                return
+            yield text
+
+
+def read_mapped(path, size=1 << 20, encoding="utf-8"):
+    # Decodes a memory-mapped file size bytes at a time, so only one slice
+    # of it is ever held as bytes and as text.
+    import mmap
+
+    with open(path, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return
+        with mapped:
+            decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+            for offset in range(0, len(mapped), size):
+                text = decoder.decode(mapped[offset:offset + size])
+                if text:
+                    yield text
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                yield tail
+
+
+def is_bullet_line(line):
+    return BULLET_RE.match(line) is not None
+
+
+def in_parentheses(text, start, end):
+    # Like PAREN_RE, a "(" pairs with the first ")" after it, so text[start:end]
+    # ends inside parentheses if its last "(" comes after its last ")".
+    if text.find("(", start, end) < 0:
+        return False
+    inside = False
+    pos = start
+    for match in PAREN_FREE_RE.finditer(text, start, end):
+        inside = paren_state(text, pos, match.start(), inside)
+        pos = match.end()
+    return paren_state(text, pos, end, inside)
+
+
+def paren_state(text, start, end, inside):
+    last_open = text.rfind("(", start, end)
+    last_close = text.rfind(")", start, end)
+    if last_open == last_close:
+        return inside
+    return last_open > last_close
+
+
+class BlockSplitter:
+    def __init__(self, max_chars=65536):
+        self.max_chars = max_chars
+        self.buffer = ""
+        self.scanned = 0
+
+    def is_break(self, start, match):
+        buf = self.buffer
+        if in_parentheses(buf, start, match.start()):
+            return False
+        line_start = buf.rfind("\n", 0, match.start()) + 1
+        if match.group(0) == "\n":
+            if GLUED_LINE_RE.match(buf, match.end()):
+                return False
+            line = buf[line_start:match.start()]
+            stripped = line.strip()
+            return is_bullet_line(line) or (stripped != "" and stripped[-1] in SENTENCE_END)
+        # Bullet items are only whole once their line ends, because
+        # normalize_bullets adds the closing period per line.
+        return not is_bullet_line(buf[line_start:match.end()])
+
+    def feed(self, text):
+        self.buffer += text
+        blocks = []
+        start = 0
+        for match in SENTENCE_BREAK_RE.finditer(self.buffer, self.scanned):
+            if self.is_break(start, match):
+                blocks.append(self.buffer[start:match.end()])
+                start = match.end()
+        if len(self.buffer) - start > self.max_chars:
+            cut = self.buffer.rfind(" ", start) + 1
+            if cut <= start:
+                cut = len(self.buffer)
+            blocks.append(self.buffer[start:cut])
+            start = cut
+        self.buffer = self.buffer[start:]
+        self.scanned = len(self.buffer.rstrip())
+        return blocks
+
+    def close(self):
+        rest = self.buffer
+        self.buffer = ""
+        self.scanned = 0
+        return rest
+
+
+def ends_sentence(text):
+    return bool(text) and text[-1] in SENTENCE_END
+
+
+def starts_with_punctuation(text):
+    return LEADING_PUNCT_RE.match(text) is not None
+
+
+def stream_process(chunks, process, max_chars=65536, min_chars=0):
+    # min_chars gathers blocks until there is at least that much text before
+    # processing, trading latency for fewer, larger calls. Joining the
+    # outputs with spaces gives the output for the whole text.
+    #
+    # Each output is held until the next one is ready: when that starts with
+    # punctuation (its block began with something dropped, like an emoji),
+    # normalize_whitespace would have glued the two, so their text is
+    # processed again as one.
+    splitter = BlockSplitter(max_chars)
+    parts = []
+    size = 0
+    held = None
+    for chunk in chunks:
+        for block in splitter.feed(chunk):
+            parts.append(block)
+            size += len(block)
+            if size < min_chars:
+                continue
+            pending = "".join(parts)
+            out = process(pending)
+            if held is not None and starts_with_punctuation(out):
+                pending = held[0] + pending
+                size = len(pending)
+                out = process(pending)
+                held = None
+            # A block whose output does not end a sentence (e.g. "Dr." became
+            # "doctor") is held back and reprocessed with what follows.
+            if ends_sentence(out) or size > max_chars:
+                if held is not None and held[1]:
+                    yield held[1]
+                held = (pending, out)
+                parts = []
+                size = 0
+            else:
+                parts = [pending]
+    parts.append(splitter.close())
+    pending = "".join(parts)
+    out = process(pending) if pending.strip() else ""
+    if held is not None and starts_with_punctuation(out):
+        out = process(held[0] + pending)
+        held = None
+    if held is not None and held[1]:
+        yield held[1]
+    if out:
+        yield out
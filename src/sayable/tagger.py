@@ -13,6 +13,13 @@ def already_tagged(sentence, allowed_tags):
     return False
 
 
+def predict_all(classifier, sentences):
+    # Classifiers written against the older interface only have predict().
+    if hasattr(classifier, "predict_batch"):
+        return classifier.predict_batch(sentences)
+    return [classifier.predict(sentence) for sentence in sentences]
+
+
 def insert_tags(text, classifier, config):
     if not config.get("tagger_enabled", True):
         return text
@@ -23,13 +30,16 @@ def insert_tags(text, classifier, config):
     position = config.get("tag_position", "prefix")
 
     sentences = split_sentences(text)
+    tagged = [already_tagged(sentence, allowed_tags) for sentence in sentences]
+    untagged = [sentence for sentence, done in zip(sentences, tagged) if not done]
+    predictions = iter(predict_all(classifier, untagged))
     out = []
 
-    for sentence in sentences:
-        if already_tagged(sentence, allowed_tags):
+    for sentence, done in zip(sentences, tagged):
+        if done:
             out.append(sentence)
             continue
-        label, conf = classifier.predict(sentence)
+        label, conf = next(predictions)
         tag = label_to_tag.get(label, "")
         if tag and conf >= min_conf:
             if position == "suffix":
@@ -0,0 +1,137 @@
+import multiprocessing
+import os
+import sys
+import time
+from fnmatch import fnmatch
+
+from .pipeline import init_worker, worker_process
+
+
+def find_files(input_dir, include=("*",), exclude=(), prune=None):
+    # Paths relative to input_dir, matched with fnmatch against the relative
+    # path ("*" also matches "/"), in a stable order. prune is a directory
+    # not to descend into, e.g. an output directory inside the input tree.
+    prune = os.path.abspath(prune) if prune else None
+    found = []
+    for root, dirs, files in os.walk(input_dir):
+        dirs[:] = sorted(d for d in dirs if os.path.abspath(os.path.join(root, d)) != prune)
+        for name in sorted(files):
+            rel = os.path.relpath(os.path.join(root, name), input_dir).replace(os.sep, "/")
+            if any(fnmatch(rel, p) for p in include) and not any(fnmatch(rel, p) for p in exclude):
+                found.append(rel)
+    return found
+
+
+def output_path(output_dir, rel, suffix=None):
+    if suffix:
+        rel = os.path.splitext(rel)[0] + suffix
+    return os.path.join(output_dir, *rel.split("/"))
+
+
+def is_current(src, dst):
+    try:
+        return os.stat(dst).st_mtime_ns > os.stat(src).st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def write_atomic(path, text):
+    # Readers of path see the old file or the whole new one, never a partial
+    # write. The temp name is unique per process, and os.open keeps the
+    # usual umask-based permissions.
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = os.path.join(directory, f".{os.path.basename(path)}.{os.getpid()}.tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def convert_file(task):
+    rel, src, dst = task
+    try:
+        with open(src, "r", encoding="utf-8") as f:
+            text = f.read()
+        out = worker_process(text)
+        if not out.endswith("\n"):
+            out += "\n"
+        write_atomic(dst, out)
+    except Exception as exc:
+        # One unreadable or unconvertible file is reported, not fatal.
+        return rel, 0, 0, str(exc)
+    return rel, len(text.encode("utf-8")), len(out.encode("utf-8")), None
+
+
+def run_tree(
+    input_dir,
+    output_dir,
+    include=("*",),
+    exclude=(),
+    suffix=None,
+    force=False,
+    config_path=None,
+    overrides=None,
+    model_path=None,
+    workers=None,
+    cache_path=None,
+    cache_size=None,
+    errors=None,
+):
+    stats = {"files": 0, "skipped": 0, "errors": 0, "bytes_in": 0, "bytes_out": 0}
+    start = time.perf_counter()
+    tasks = []
+    for rel in find_files(input_dir, include, exclude, prune=output_dir):
+        src = os.path.join(input_dir, *rel.split("/"))
+        dst = output_path(output_dir, rel, suffix)
+        if not force and is_current(src, dst):
+            stats["skipped"] += 1
+        else:
+            tasks.append((rel, src, dst))
+
+    initargs = (config_path, overrides, model_path, cache_path, cache_size)
+    pool = None
+    if not tasks:
+        results = []
+    elif workers == 1 or len(tasks) == 1:
+        init_worker(*initargs)
+        results = map(convert_file, tasks)
+    else:
+        # One file per task: files vary a lot in size, so workers pick up the
+        # next one as soon as they finish.
+        pool = multiprocessing.Pool(min(workers or os.cpu_count() or 1, len(tasks)), init_worker, initargs)
+        results = pool.imap_unordered(convert_file, tasks, chunksize=1)
+
+    try:
+        for rel, bytes_in, bytes_out, error in results:
+            if error is not None:
+                stats["errors"] += 1
+                print(f"sayable: {rel}: {error}", file=errors or sys.stderr)
+                continue
+            stats["files"] += 1
+            stats["bytes_in"] += bytes_in
+            stats["bytes_out"] += bytes_out
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+
+def format_tree_stats(stats):
+    seconds = max(stats["seconds"], 1e-9)
+    return (
+        f"{stats['files']} files ({stats['skipped']} up to date, {stats['errors']} errors), "
+        f"{stats['bytes_in']} bytes in, {stats['bytes_out']} bytes out in {stats['seconds']:.2f}s: "
+        f"{stats['files'] / seconds:.1f} files/s, {stats['bytes_in'] / seconds / 1e6:.2f} MB/s"
+    )
@@ -0,0 +1,33 @@
+import json
+import os
+
+from sayable import artifacts
+from sayable.classifier import train_nb
+from sayable.pipeline import load_pipeline
+
+
+def test_artifacts_follow_sources(tmp_path):
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps({"time_style": "24h"}))
+    model_path = tmp_path / "model.json"
+    model_path.write_text(json.dumps(train_nb([("yay", "laugh"), ("meh", "none")])))
+    artifacts.enable(str(tmp_path / "cache"))
+    try:
+        cfg, classifier = load_pipeline(str(config_path), model_path=str(model_path))
+        names = sorted(os.listdir(tmp_path / "cache"))
+        assert [name.split("-")[0] for name in names] == ["config", "model"]
+        assert load_pipeline(str(config_path), model_path=str(model_path))[1].model == classifier.model
+        assert load_pipeline(str(config_path))[0] == cfg
+        assert sorted(os.listdir(tmp_path / "cache")) == names
+
+        calls = []
+        assert artifacts.cached("config", lambda: calls.append(1), sources=(str(config_path),)) == cfg
+        assert calls == []
+
+        config_path.write_text(json.dumps({"time_style": "12h", "paren_policy": "strip"}))
+        cfg, _ = load_pipeline(str(config_path), {"url_policy": "full"})
+        assert (cfg["time_style"], cfg["paren_policy"], cfg["url_policy"]) == ("12h", "strip", "full")
+        assert len(os.listdir(tmp_path / "cache")) == 3
+        assert load_pipeline(str(config_path), {"tagger_enabled": False})[1] is None
+    finally:
+        artifacts.disable()
@@ -0,0 +1,44 @@
+import io
+import json
+
+from sayable.batch import run_batch
+
+
+def run(lines, **kwargs):
+    sink = io.StringIO()
+    stats = run_batch(io.StringIO("".join(lines)), sink, **kwargs)
+    return [json.loads(line) for line in sink.getvalue().splitlines()], stats
+
+
+def test_batch_keeps_order_and_ids():
+    lines = [json.dumps({"id": i, "text": f"GPU {i}"}) + "\n" for i in range(40)]
+    out, stats = run(lines, overrides={"tagger_enabled": False}, workers=2, chunk_size=3)
+    assert [r["id"] for r in out] == list(range(40))
+    assert out[3]["text"] == "g p u three"
+    assert stats["records"] == 40
+    assert stats["errors"] == 0
+
+
+def test_batch_reports_bad_records():
+    lines = [
+        '{"text": "ok"}\n',
+        "\n",
+        "nope\n",
+        '{"id": 1}\n',
+        '{"text": "at 21:00", "config": {"time_style": "24h"}}\n',
+    ]
+    out, stats = run(lines, workers=1)
+    assert out[0] == {"text": "ok"}
+    assert out[1]["line"] == 3
+    assert out[2] == {"line": 4, "error": "record needs a string 'text' field"}
+    assert out[3] == {"text": "at twenty one o'clock"}
+    assert stats["errors"] == 2
+
+
+def test_batch_survives_bad_config_record():
+    lines = [json.dumps({"id": i, "text": f"GPU {i}"}) + "\n" for i in range(6)]
+    lines[2] = json.dumps({"id": "bad", "text": "a", "config": {"abbreviations": {"a": ["b"]}}}) + "\n"
+    out, stats = run(lines, overrides={"tagger_enabled": False}, workers=2, chunk_size=1)
+    assert out[2] == {"line": 3, "id": "bad", "error": "config override 'abbreviations' must be an object of strings"}
+    assert [r.get("text") for r in out] == ["g p u zero", "g p u one", None, "g p u three", "g p u four", "g p u five"]
+    assert stats["errors"] == 1
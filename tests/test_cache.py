@@ -0,0 +1,52 @@
+import threading
+
+from sayable.cache import LRUCache
+from sayable.config import load_config
+from sayable.normalizer import ENTITY_CACHE, normalize_text
+
+
+def test_lru_eviction_and_stats():
+    cache = LRUCache(max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"
+    cache.put("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("c") == "3"
+    stats = cache.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"], stats["evictions"]) == (2, 2, 1, 1)
+
+    small = LRUCache(max_bytes=300)
+    for i in range(20):
+        small.put(("k", str(i)), "x" * 40)
+    assert 0 < len(small) < 20 and small.stats()["bytes"] <= 300
+
+
+def test_entity_cache_respects_config():
+    cfg = load_config(None)
+    full = dict(cfg, url_policy="full")
+    text = "Read https://example.com/docs/intro and mail ops@example.io."
+    ENTITY_CACHE.clear()
+    first = normalize_text(text, cfg)
+    assert normalize_text(text, cfg) == first
+    assert ENTITY_CACHE.stats()["hits"] == 2
+    assert normalize_text(text, full) != first
+    assert "slash docs slash intro" in normalize_text(text, full)
+
+
+def test_cache_threads():
+    cache = LRUCache(max_entries=50)
+
+    def work(offset):
+        for i in range(2000):
+            key = (i + offset) % 80
+            if cache.get(key) is None:
+                cache.put(key, str(key))
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = cache.stats()
+    assert stats["entries"] == 50 and stats["hits"] + stats["misses"] == 8000
@@ -0,0 +1,98 @@
+import math
+
+import pytest
+
+from sayable.classifier import DEFAULT_TRAINING, NaiveBayesTagger, predict_numpy, tokenize, train_nb
+
+
+def test_prebuilt_default_model_matches_training():
+    # Regenerate with scripts/build_default_model.py if this fails.
+    assert NaiveBayesTagger().model == train_nb(DEFAULT_TRAINING)
+
+
+def test_default_model_not_shared():
+    first, second = NaiveBayesTagger(), NaiveBayesTagger()
+    first.model["log_default"][first.model["labels"][0]] = 0.0
+    first.model["vocab"].append("zzz")
+    assert second.model == NaiveBayesTagger().model == train_nb(DEFAULT_TRAINING)
+
+
+def reference_predict(model, text):
+    scores = []
+    for label in model["labels"]:
+        ll = model["log_likelihoods"][label]
+        default = model["log_default"][label]
+        tokens = [tok for tok in tokenize(text) if tok in model["vocab"]]
+        scores.append(model["log_priors"][label] + sum(ll.get(tok, default) for tok in tokens))
+    best = max(range(len(scores)), key=scores.__getitem__)
+    return model["labels"][best], 1 / sum(math.exp(s - scores[best]) for s in scores)
+
+
+SENTENCES = ["haha that was funny", "ugh oh no", "", "unknown words only", "lol lol wow :)"]
+
+
+def test_predict_batch_matches_reference():
+    tagger = NaiveBayesTagger()
+    got = tagger.predict_batch(SENTENCES)
+    for text, (label, conf) in zip(SENTENCES, got):
+        want_label, want_conf = reference_predict(tagger.model, text)
+        assert label == want_label
+        assert conf == pytest.approx(want_conf)
+    assert tagger.predict("haha that was funny") == got[0]
+
+
+def test_predict_numpy_matches_python():
+    pytest.importorskip("numpy")
+    tagger = NaiveBayesTagger()
+    got = predict_numpy(tagger.tables(), SENTENCES)
+    assert [label for label, _ in got] == [label for label, _ in tagger.predict_batch(SENTENCES)]
+
+
+def test_binary_model_round_trip(tmp_path):
+    from sayable.modelfile import PackedModel, is_binary_model, write_binary
+    from sayable.pipeline import load_classifier
+
+    model = train_nb(DEFAULT_TRAINING + [("café au lait", "none")])
+    path = tmp_path / "model.bin"
+    write_binary(model, str(path))
+    assert is_binary_model(str(path))
+    packed = PackedModel(str(path))
+    assert packed.labels == model["labels"]
+    assert packed.vocab == model["vocab"]
+    back = packed.to_dict()
+    assert back["log_priors"] == model["log_priors"]
+    assert back["log_likelihoods"]["laugh"]["lol"] == pytest.approx(model["log_likelihoods"]["laugh"]["lol"], rel=1e-6)
+
+    tagger = load_classifier(str(path))
+    assert tagger.model is None
+    assert [label for label, _ in tagger.predict_batch(SENTENCES)] == [
+        label for label, _ in NaiveBayesTagger(model).predict_batch(SENTENCES)
+    ]
+    assert tagger.identity() == packed.digest()
+
+
+def test_feature_selection_and_quantization(tmp_path):
+    from sayable.classifier import select_features
+    from sayable.modelfile import PackedModel, write_binary
+
+    examples = [("lol the", "laugh"), ("haha lol a", "laugh"), ("ugh the", "groan"), ("ugh a b", "groan")]
+    assert select_features(examples, min_count=2) == {"lol", "the", "a", "ugh"}
+    assert select_features(examples, top_k=1) == {"lol", "ugh"}
+    assert select_features(examples, top_k=1, score="ig") == {"lol", "ugh"}
+    assert train_nb(examples, keep={"lol", "ugh"})["vocab"] == ["lol", "ugh"]
+    with pytest.raises(ValueError, match="no features"):
+        train_nb(examples, keep=set())
+    with pytest.raises(ValueError, match="no features"):
+        train_nb([])
+
+    model = train_nb(DEFAULT_TRAINING)
+    full = NaiveBayesTagger(model).predict_batch(SENTENCES)
+    for value_type in ("int16", "int8"):
+        path = str(tmp_path / f"{value_type}.bin")
+        write_binary(model, path, value_type)
+        packed = PackedModel(path)
+        assert packed.value_type == value_type
+        got = NaiveBayesTagger(tables=packed).predict_batch(SENTENCES)
+        assert [label for label, _ in got] == [label for label, _ in full]
+        lol = packed.to_dict()["log_likelihoods"]["laugh"]["lol"]
+        assert lol == pytest.approx(model["log_likelihoods"]["laugh"]["lol"], abs=0.02)
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import threading
+import time
+
+import pytest
+
+from sayable import daemon
+from sayable.daemon import DaemonUnavailable, request_text, run_daemon, socket_path
+from sayable.pipeline import load_pipeline, process_text
+
+
+def start_daemon(tmp_path):
+    path = str(tmp_path / "sayable.sock")
+    thread = threading.Thread(target=run_daemon, args=(path, 1.0))
+    thread.start()
+    for _ in range(100):
+        if (tmp_path / "sayable.sock").exists():
+            break
+        time.sleep(0.01)
+    return path, thread
+
+
+def test_daemon_matches_in_process(tmp_path):
+    path, thread = start_daemon(tmp_path)
+    try:
+        text = "Dr. Smith met the GPU team at 10:30 (see https://example.com/a)."
+        overrides = {"time_style": "24h", "tagger_enabled": False}
+        cfg, classifier = load_pipeline(overrides=overrides)
+        assert request_text(text, overrides=overrides, path=path) == process_text(text, cfg, classifier)
+        assert request_text("e.g. 2 min", path=path) == "for example two minutes"
+    finally:
+        thread.join()
+    assert not (tmp_path / "sayable.sock").exists()
+
+
+def test_daemon_survives_failed_requests(tmp_path, monkeypatch):
+    path, thread = start_daemon(tmp_path)
+    try:
+        with pytest.raises(DaemonUnavailable):
+            request_text("a", overrides={"abbreviations": {"a": ["b"]}, "tagger_enabled": False}, path=path)
+        assert request_text("e.g. 2 min", path=path) == "for example two minutes"
+
+        # A socket owned by someone else is never used (nor replaced).
+        monkeypatch.setattr(daemon.os, "getuid", lambda: os.geteuid() + 1)
+        with pytest.raises(DaemonUnavailable):
+            request_text("e.g. 2 min", path=path)
+    finally:
+        thread.join()
+
+
+def test_socket_path_uses_private_dir(tmp_path, monkeypatch):
+    monkeypatch.delenv("SAYABLE_SOCKET", raising=False)
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    path = socket_path()
+    assert os.path.dirname(path) == str(tmp_path / f"sayable-{os.getuid()}")
+    assert os.stat(os.path.dirname(path)).st_mode & 0o777 == 0o700
+
+    monkeypatch.setattr(daemon.sys, "executable", "/other/python")
+    assert os.path.dirname(socket_path()) == os.path.dirname(path)
+    assert socket_path() != path
+
+    os.chmod(os.path.dirname(path), 0o777)
+    with pytest.raises(DaemonUnavailable):
+        socket_path()
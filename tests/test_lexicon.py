@@ -0,0 +1,16 @@
+from sayable.lexicon import compile_lexicon
+
+
+def test_longest_match_wins():
+    matcher = compile_lexicon({"CI": "c i", "CD": "c d", "CI/CD": "c i slash c d"})
+    assert matcher.sub("Ship CI/CD, then CI.") == "Ship c i slash c d, then c i."
+
+
+def test_case_insensitive_with_word_boundaries():
+    matcher = compile_lexicon({"API": "a p i"})
+    assert matcher.sub("api APIs Api") == "a p i APIs a p i"
+
+
+def test_without_word_boundaries():
+    matcher = compile_lexicon({"etc.": "et cetera"}, word_boundaries=False)
+    assert matcher.sub("[sigh]etc.") == "[sigh]et cetera"
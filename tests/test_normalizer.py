@@ -1,7 +1,21 @@
+import gc
+
 import pytest
 
 from sayable.config import load_config
-from sayable.normalizer import normalize_text
+from sayable.lazyre import lazy_compile
+from sayable.normalizer import (
+    ASCII_TWINS,
+    NUMERIC_RE,
+    Normalizer,
+    normalize_text,
+    normalize_with_offsets,
+    number_to_words,
+    ordinal_to_words,
+    scan_pattern,
+    text_census,
+    time_to_words,
+)
 
 
 @pytest.fixture()
@@ -41,3 +55,141 @@ def test_email_and_url(cfg):
         normalize_text(text, cfg)
         == "Email test dot user plus a i at example dot com and visit example dot com"
     )
+
+
+def test_numeric_scanner_priority(cfg):
+    text = "MAC 00:1A:2B:3C:4D:5E at 10:30 took 1,500 ms on 10.0.0.1, the 2nd run."
+    assert (
+        normalize_text(text, cfg)
+        == "mac zero zero colon one a colon two b colon three c colon four d colon five e at ten thirty took one thousand five hundred milliseconds on one zero dot zero dot zero dot one, the second run."
+    )
+
+
+def test_word_tables_edges():
+    assert number_to_words(9999) == "nine thousand nine hundred ninety nine"
+    assert number_to_words(10000) == "ten thousand"
+    assert number_to_words(2_000_010_001) == "two billion ten thousand one"
+    assert ordinal_to_words(9912) == "nine thousand nine hundred twelfth"
+    assert ordinal_to_words(120_000) == "one hundred twenty thousandth"
+    assert time_to_words(0, 5, "am", {}) == "twelve oh five a m"
+    assert time_to_words(0, 0, None, {"time_style": "24h", "time_zero": "hundred"}) == "zero hundred"
+
+
+def test_structural_tokens(cfg):
+    text = "Ping @GPU_team at https://api.example.com/v1, or see ~/src/app.py and O(n/2)."
+    assert (
+        normalize_text(text, cfg)
+        == "Ping at g p u team at a p i dot example dot com, or see home slash src slash app dot py and big o of n slash two."
+    )
+
+
+def test_structural_precedence(cfg):
+    # URLs, emails and Windows paths win over Unix paths, which stop where
+    # a handle or hashtag could start.
+    assert normalize_text("[bogus]/C:\\Users\\me\\x.txt.", cfg) == "slash C drive slash Users slash me slash x dot txt."
+    assert normalize_text("and/orx@y.io", cfg) == "and slash orx at y dot i o"
+    assert normalize_text("/GPU-#HashTag", cfg) == "slash g p u dash hashtag Hash Tag"
+    assert normalize_text("#HashTag-x@y.io", cfg) == "hashtag Hash Tag dash x at y dot i o"
+    assert normalize_text("see /usr/bin/x#frag and /x/https://y.com/z", cfg) == (
+        "see slash usr slash bin slash x hash frag and slash x slash y dot com"
+    )
+    assert normalize_text("O(x@y.io)", cfg) == "big o of x at y dot i o"
+
+
+def test_structural_glued_text(cfg):
+    assert normalize_text("C:\\Users\\me/file.txt", cfg) == "C drive slash Users slash me slash file dot txt"
+    assert normalize_text("C:\\a\\b/a-#b", cfg) == "C drive slash a slash b slash a dash hashtag b"
+    assert normalize_text("O(n^2)99th", cfg) == "big o of n ^ two ninety ninth"
+    assert normalize_text("CI/CD O(n^2)12:00", cfg) == "c i slash c d big o of n ^ two twelve o'clock"
+    assert normalize_text("#10:30", cfg) == "hashtag ten thirty"
+    # Span keys cannot be forged from the input.
+    assert normalize_text("x __SPAN0__ y https://a.com", cfg) == "x __SPAN0__ y a dot com"
+    assert normalize_text("x \ue000\ue010\ue001 https://a.com", cfg) == "x a dot com"
+
+
+def test_structural_plus_and_ampersand(cfg):
+    assert normalize_text("Path /opt/a+b/x", cfg) == "Path slash opt slash a plus b slash x"
+    assert normalize_text("~/R&D/notes.txt", cfg) == "home slash R and D slash notes dot txt"
+    assert normalize_text("O(n+m) time", cfg) == "big o of n plus m time"
+    assert normalize_text("O(V&E)", cfg) == "big o of V and E"
+    cfg["url_policy"] = "full"
+    assert normalize_text("https://a.b/x-y+z", cfg) == "a dot b slash x dash y plus z"
+
+
+def test_compiled_normalizer(cfg):
+    text = "lol the API at 14:00 (see www.example.com) & more"
+    normalizer = Normalizer(cfg)
+    assert normalizer.normalize(text) == normalize_text(text, cfg)
+    assert not hasattr(normalizer, "__dict__")
+
+    cfg["time_style"] = "24h"
+    cfg["abbreviations"]["lol"] = "laughing"
+    assert normalize_text(text, cfg) == Normalizer(cfg).normalize(text) != normalizer.normalize(text)
+    assert normalize_text(text, cfg).startswith("laughing the a p i at fourteen o'clock")
+
+    # Lexicons of empty keys match nothing.
+    cfg["abbreviations"] = {"": "x"}
+    cfg["tech_pronunciations"] = {"": "y"}
+    assert Normalizer(cfg).normalize("lol at https://a.com") == "lol at a dot com"
+
+
+def test_trigger_gating(cfg):
+    assert text_census("see you later") == set()
+    assert text_census("Meet @ 10:30, Www.x") == {"@", ":", "digit", "upper", "www."}
+    assert text_census("a few mins café") == {"min", "non_ascii"}
+    assert text_census("١٢ apples") == {"digit", "non_ascii"}
+    assert normalize_text("١٢ apples", cfg) == "twelve apples"
+
+    assert normalize_text("see you later", cfg) == "see you later"
+    assert normalize_text("  see you  later .", cfg) == "see you later."
+    assert normalize_text("- see you later", cfg) == "see you later."
+    assert normalize_text("a few mins, etc.", cfg) == "a few minutes, et cetera"
+    assert normalize_text("ab:ef:ab:ef:ab:ef", cfg) == "a b colon e f colon a b colon e f colon a b colon e f"
+    assert normalize_text("see www.example.com", cfg) == "see w w w dot example dot com"
+    cfg["abbreviations"] = {"zz": "the GPU at 5"}
+    assert normalize_text("zz", cfg) == "the g p u at five"
+
+
+def test_offsets_map_back_to_source(cfg):
+    text = "- Meet [sigh] at 10:30\n- see https://x.io/a, ok"
+    out, source_map = normalize_with_offsets(text, cfg)
+    assert out == normalize_text(text, cfg) == "Meet [sigh] at ten thirty. see x dot i o, ok."
+
+    def source_of(word):
+        start = out.index(word)
+        begin, end = source_map.source_span(start, start + len(word))
+        return text[begin:end]
+
+    assert source_of("Meet") == "Meet"
+    assert source_of("[sigh]") == "[sigh]"
+    assert source_of("ten thirty") == "10:30"
+    assert source_of("x dot i o") == "https://x.io/a,"
+    segments = source_map.segments()
+    assert segments[0] == (0, 5, 2, 7)
+    assert segments[-1][1] == len(out)
+
+
+def test_emoji_and_typography(cfg):
+    text = "ok 👍🏽 ❤️ \U0001F1FA\U0001F1F8 👨‍👩‍👧 1️⃣ “hi” — it’s…\ud800"
+    assert normalize_text(text, cfg) == "ok one “hi” — it’s…"
+    cfg["fold_typography"] = True
+    assert normalize_text(text, cfg) == "ok one \"hi\" - it's..."
+    out, source_map = normalize_with_offsets("“hi” — it’s", cfg)
+    assert out == "\"hi\" - it's"
+    assert source_map.source_span(out.index("-"), out.index("-") + 1) == (5, 6)
+
+
+def test_ascii_patterns(cfg):
+    assert scan_pattern(NUMERIC_RE, text_census("at 10:30")) is not NUMERIC_RE
+    assert scan_pattern(NUMERIC_RE, text_census("at 10:30 café")) is NUMERIC_RE
+    # Twins are dropped with their pattern.
+    unicode_only, plain = lazy_compile("caf[eé]"), lazy_compile(r"\w+")
+    assert scan_pattern(unicode_only, set()) is unicode_only
+    assert scan_pattern(plain, set()) is not plain
+    count = len(ASCII_TWINS)
+    del unicode_only, plain
+    gc.collect()
+    assert len(ASCII_TWINS) == count - 2
+    # Unicode \s also matches the ASCII separators \x1c-\x1f.
+    assert text_census("a\x1c b") == {"non_ascii"}
+    assert normalize_text("hi \x1c\x1c . there", cfg) == "hi. there"
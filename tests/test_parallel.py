@@ -0,0 +1,33 @@
+from sayable import parallel
+from sayable.pipeline import load_pipeline, make_processor
+
+
+def test_process_document_matches_serial(monkeypatch):
+    monkeypatch.setattr(parallel, "MIN_PIECE_CHARS", 50)
+    text = "See Dr.\nWho (an aside\n- wow\nmore). lol that was at 12:00 pm.\n\n- one\n- two\nDone!\n" * 30
+    process = make_processor(*load_pipeline())
+    assert len(parallel.split_document(text, 50)) > 30
+    assert parallel.process_document(text, jobs=2) == process(text)
+    assert parallel.process_document(text, jobs=1) == process(text)
+
+
+def test_process_document_keeps_punctuation_after_breaks(monkeypatch):
+    monkeypatch.setattr(parallel, "MIN_PIECE_CHARS", 1)
+    monkeypatch.setattr(parallel, "PIECES_PER_JOB", 1000)
+    text = "Well okay!\n... what happened? So ... I do not know.\n, sadly. That was it.\n" * 20
+    process = make_processor(*load_pipeline())
+    assert "okay!... what" in process(text)
+    assert parallel.process_document(text, jobs=2) == process(text)
+    assert parallel.process_document(text, jobs=1) == process(text)
+
+
+def test_process_document_splits_outside_real_parentheses(monkeypatch):
+    monkeypatch.setattr(parallel, "MIN_PIECE_CHARS", 1)
+    monkeypatch.setattr(parallel, "PIECES_PER_JOB", 1000)
+    text = (
+        "Steps (in order:\n1) boot.\n2) log in.\nthen rest). Sorting (is O(n log n) here. ok) fine.\n"
+        "That is great! \U0001F600! Really.\n"
+    ) * 10
+    process = make_processor(*load_pipeline())
+    assert parallel.process_document(text, jobs=2) == process(text)
+    assert parallel.process_document(text, jobs=1) == process(text)
@@ -0,0 +1,23 @@
+from sayable.config import load_config
+from sayable.pipeline import PipelinePool, load_classifier, process_text
+
+
+def test_pool_reuses_compiled_pipelines():
+    pool = PipelinePool(max_entries=2)
+    default = pool.get()
+    assert pool.get() is default
+    assert pool.get({"time_style": "12h"}) is default
+
+    text = "lol the GPU died at 14:05 (again)"
+    evening = pool.get({"time_style": "24h"})
+    cfg = dict(load_config(None), time_style="24h")
+    assert evening.process(text) == process_text(text, cfg, load_classifier())
+    assert evening.normalizer.tech_terms is default.normalizer.tech_terms
+
+    stats = pool.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 2, 2)
+    assert stats["compile_seconds"] > 0
+
+    pool.get({"paren_policy": "strip"})
+    assert pool.stats()["evictions"] == 1
+    assert pool.get({"time_style": "24h"}) is evening
@@ -0,0 +1,97 @@
+import asyncio
+import json
+
+from sayable.server import Server
+
+
+async def post(port, path, payload):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode("utf-8")
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+        + body
+    )
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, body = raw.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+def test_server_routes():
+    async def scenario():
+        server = Server(overrides={"tagger_enabled": False}, workers=1)
+        listener = await server.start("127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            results = await asyncio.gather(
+                post(port, "/normalize", {"text": "GPU at 10:30"}),
+                post(port, "/process", {"text": "e.g. 2 min"}),
+                post(port, "/normalize", {"nope": 1}),
+                post(port, "/missing", {"text": ""}),
+                post(
+                    port,
+                    "/normalize",
+                    {"text": "at 14:00 (ok)", "config": {"time_style": "24h", "paren_policy": "strip"}},
+                ),
+                post(port, "/normalize", {"text": "GPU at 10:30", "offsets": True}),
+                post(port, "/tag", {"text": "lol", "offsets": True}),
+            )
+        finally:
+            listener.close()
+            await listener.wait_closed()
+            server.close()
+        return results
+
+    results = asyncio.run(scenario())
+    assert results[0] == (200, {"text": "g p u at ten thirty"})
+    assert results[1] == (200, {"text": "for example two minutes"})
+    assert results[2][0] == 400
+    assert results[3][0] == 404
+    assert results[4] == (200, {"text": "at fourteen o'clock"})
+    assert results[5] == (200, {"text": "g p u at ten thirty", "offsets": [[0, 5, 0, 3], [5, 9, 3, 7], [9, 19, 7, 12]]})
+    assert results[6][0] == 400
+
+
+async def send(port, raw):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(raw)
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, body = raw.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+class FailingServer(Server):
+    async def dispatch(self, method, path, body):
+        if path == "/fail":
+            raise RuntimeError("boom")
+        return await super().dispatch(method, path, body)
+
+
+def test_server_errors():
+    async def scenario():
+        server = FailingServer(overrides={"tagger_enabled": False}, workers=1)
+        listener = await server.start("127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            results = [
+                await post(port, "/normalize", {"text": "a", "config": {"abbreviations": {"a": ["b"]}}}),
+                await post(port, "/normalize", {"text": "a", "config": {"acronym_stoplist": 5}}),
+                await send(port, b"POST /normalize HTTP/1.1\r\nContent-Length: -5\r\n\r\n"),
+                await post(port, "/fail", {"text": "a"}),
+                await post(port, "/normalize", {"text": "e.g. 2 min"}),
+            ]
+        finally:
+            listener.close()
+            await listener.wait_closed()
+            server.close()
+        return results
+
+    results = asyncio.run(scenario())
+    assert results[0] == (400, {"error": "config override 'abbreviations' must be an object of strings"})
+    assert results[1] == (400, {"error": "config override 'acronym_stoplist' must be a list of strings"})
+    assert results[2] == (400, {"error": "negative Content-Length"})
+    assert results[3] == (500, {"error": "internal server error"})
+    assert results[4] == (200, {"text": "for example two minutes"})
@@ -0,0 +1,43 @@
+from sayable.classifier import NaiveBayesTagger, train_nb
+from sayable.pipeline import load_pipeline, make_processor, process_text
+from sayable.store import ResultStore, fingerprint
+
+
+def test_fingerprint_tracks_config_and_model():
+    cfg, classifier = load_pipeline()
+    base = fingerprint(cfg, classifier)
+    assert fingerprint(dict(cfg), NaiveBayesTagger()) == base
+    assert fingerprint(dict(cfg, time_style="24h"), classifier) != base
+    other = NaiveBayesTagger(train_nb([("yay", "laugh"), ("meh", "none")]))
+    assert fingerprint(cfg, other) != base
+    no_tags = dict(cfg, tagger_enabled=False)
+    assert fingerprint(no_tags, classifier) == fingerprint(no_tags, other)
+
+
+def test_cached_processor_matches(tmp_path):
+    cfg, classifier = load_pipeline()
+    store = ResultStore(str(tmp_path / "cache.db"))
+    process = make_processor(cfg, classifier, store)
+    text = "lol the GPU rebooted at 10:30. Dr. Who?"
+    assert process(text) == process_text(text, cfg, classifier)
+    assert process(text) == process_text(text, cfg, classifier)
+    assert (store.hits, store.misses) == (1, 1)
+    store.close()
+
+    cfg_24h = dict(cfg, time_style="24h")
+    reopened = ResultStore(str(tmp_path / "cache.db"))
+    assert make_processor(cfg_24h, classifier, reopened)(text) == process_text(text, cfg_24h, classifier)
+    assert reopened.hits == 0
+    reopened.close()
+
+
+def test_store_evicts_oldest(tmp_path):
+    store = ResultStore(str(tmp_path / "cache.db"), max_bytes=64 * 1024)
+    for i in range(2000):
+        store.put("fp", f"text {i}", "x" * 200)
+    store.close()
+    store = ResultStore(str(tmp_path / "cache.db"), max_bytes=64 * 1024)
+    assert store.used_bytes() <= 64 * 1024
+    assert store.get("fp", "text 1999") == "x" * 200
+    assert store.get("fp", "text 0") is None
+    store.close()
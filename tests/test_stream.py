@@ -0,0 +1,94 @@
+import io
+
+from sayable.classifier import NaiveBayesTagger
+from sayable.config import load_config
+from sayable.normalizer import normalize_text
+from sayable.stream import BlockSplitter, read_chunks, stream_process
+from sayable.tagger import insert_tags
+
+
+def feed_all(splitter, pieces):
+    blocks = []
+    for piece in pieces:
+        blocks.extend(splitter.feed(piece))
+    return blocks
+
+
+def test_splitter_waits_for_next_sentence():
+    splitter = BlockSplitter()
+    assert splitter.feed("One. Tw") == ["One. "]
+    assert splitter.feed("o.") == []
+    assert splitter.close() == "Two."
+
+
+def test_splitter_keeps_bullet_lines_whole():
+    splitter = BlockSplitter()
+    blocks = feed_all(splitter, ["- first. still first\n", "- second\nAfter."])
+    assert blocks == ["- first. still first\n", "- second\n"]
+    assert splitter.close() == "After."
+
+
+def test_stream_matches_batch_output():
+    cfg = load_config(None)
+    classifier = NaiveBayesTagger()
+
+    def process(text):
+        return insert_tags(normalize_text(text, cfg), classifier, cfg)
+
+    text = "Dr. Smith said hi. haha that was funny.\n- wow\n- 12:00 pm (sharp\nreally) ok."
+    pieces = [text[i:i + 3] for i in range(0, len(text), 3)]
+    out = list(stream_process(pieces, process))
+    assert out[0] == "doctor Smith said hi."
+    assert " ".join(out) == process(text)
+
+
+def test_read_chunks_decodes_split_utf8():
+    data = "café \U0001F600".encode("utf-8")
+    stream = io.BufferedReader(io.BytesIO(data), buffer_size=2)
+    assert "".join(read_chunks(stream, size=1)) == "café \U0001F600"
+
+
+def test_large_mode_matches_whole_file(tmp_path):
+    from sayable.cli import main
+
+    text = "Dr. Smith said hi (an aside\n- wow\nmore). lol that was at 12:00 pm.\n" * 200
+    src = tmp_path / "in.txt"
+    src.write_text(text, encoding="utf-8")
+    main(["--input", str(src), "--output", str(tmp_path / "whole.txt")])
+    main(["--large", "--chunk-kib", "1", "--input", str(src), "--output", str(tmp_path / "large.txt")])
+    assert (tmp_path / "large.txt").read_text(encoding="utf-8") == (tmp_path / "whole.txt").read_text(encoding="utf-8")
+
+
+def test_chunked_output_keeps_punctuation_after_breaks():
+    cfg = load_config(None)
+    classifier = NaiveBayesTagger()
+
+    def process(text):
+        return insert_tags(normalize_text(text, cfg), classifier, cfg)
+
+    text = "Well okay! ... what happened?\n... it broke. , sadly.\n- (aside) one\n-\n\n! done.\n" * 20
+    whole = process(text)
+    assert "okay!... what" in whole
+    for size in (1, 7, 64):
+        pieces = [text[i:i + size] for i in range(0, len(text), size)]
+        assert " ".join(stream_process(pieces, process)) == whole
+        assert " ".join(stream_process(pieces, process, min_chars=size)) == whole
+
+
+def test_chunked_output_matches_whole_text():
+    cfg = load_config(None)
+    classifier = NaiveBayesTagger()
+
+    def process(text):
+        return insert_tags(normalize_text(text, cfg), classifier, cfg)
+
+    text = (
+        "That is great! \U0001F600! Really. haha \U0001F600 , sure.\n"
+        "Steps (in order:\n1) boot.\n2) log in.\nthen rest). Sorting (is O(n log n) here. ok) fine.\n"
+    ) * 10
+    whole = process(text)
+    assert "great!! Really." in whole
+    for size in (1, 5, 64):
+        pieces = [text[i:i + size] for i in range(0, len(text), size)]
+        assert " ".join(stream_process(pieces, process)) == whole
+        assert " ".join(stream_process(pieces, process, min_chars=size)) == whole
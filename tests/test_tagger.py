@@ -8,3 +8,20 @@ def test_tagger_inserts_laugh():
     text = "haha that was funny."
     out = insert_tags(text, NaiveBayesTagger(), cfg)
     assert out.startswith("[laugh] ")
+
+
+class SentenceOnlyModel:
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, text):
+        self.calls.append(text)
+        return "laugh", 1.0
+
+
+def test_tagger_falls_back_to_predict():
+    cfg = load_config(None)
+    model = SentenceOnlyModel()
+    out = insert_tags("haha. [sigh] ok. fine.", model, cfg)
+    assert out == "[laugh] haha. [sigh] ok. [laugh] fine."
+    assert model.calls == ["haha.", "fine."]
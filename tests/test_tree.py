@@ -0,0 +1,47 @@
+import io
+import os
+
+from sayable.cli import main
+from sayable.tree import run_tree
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(text.encode("utf-8") if isinstance(text, str) else text)
+
+
+def test_tree_converts_and_skips_current(tmp_path):
+    src = tmp_path / "in"
+    out = tmp_path / "out"
+    write(src / "a.txt", "GPU at 10:30")
+    write(src / "docs" / "b.txt", "see 2 min")
+    write(src / "docs" / "skip.md", "not me")
+    write(src / "bad.txt", b"\xff\xfe")
+    errors = io.StringIO()
+    options = dict(include=["*.txt"], exclude=["bad.*"], overrides={"tagger_enabled": False}, errors=errors)
+
+    stats = run_tree(str(src), str(out), workers=2, **options)
+    assert (stats["files"], stats["skipped"], stats["errors"]) == (2, 0, 0)
+    assert (out / "a.txt").read_text() == "g p u at ten thirty\n"
+    assert (out / "docs" / "b.txt").read_text() == "see two minutes\n"
+    assert sorted(os.listdir(out / "docs")) == ["b.txt"]
+
+    os.utime(out / "a.txt", ns=(os.stat(src / "a.txt").st_mtime_ns - 10**9,) * 2)
+    stats = run_tree(str(src), str(out), workers=1, **options)
+    assert (stats["files"], stats["skipped"]) == (1, 1)
+
+    options["exclude"] = []
+    stats = run_tree(str(src), str(out), workers=1, **options)
+    assert (stats["files"], stats["skipped"], stats["errors"]) == (0, 2, 1)
+    assert "bad.txt" in errors.getvalue()
+
+
+def test_cli_input_dir(tmp_path, capsys):
+    notes = tmp_path / "notes"
+    write(notes / "a.txt", "e.g. 3 GB")
+    argv = ["--input-dir", str(notes), "--output-dir", str(notes / "say"), "--suffix", ".say", "--no-tags"]
+    main(argv)
+    assert (notes / "say" / "a.say").read_text() == "for example three gigabytes\n"
+    assert "1 files (0 up to date, 0 errors)" in capsys.readouterr().err
+    main(argv)
+    assert "0 files (1 up to date, 0 errors)" in capsys.readouterr().err